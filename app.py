@@ -1,20 +1,31 @@
+# Imported first so the cold-start clock covers the imports below
+import startup_report
+import profiling
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import xgboost as xgb
-import joblib
-import shap
 import warnings
+
+from chart_stats import binned_histogram, box_stats, cube_box_stats, summary_box
+from explanations import TREE_MODELS, ModelExplainer
+from figure_cache import FigureCache, state_key
+from geo import country_table
+from ml_pipeline import FEATURES, encode_profile, predict_salary, predict_salary_batch
+from model_registry import ModelRegistry
+from prediction_table import DEFAULT_SUBSET, PredictionTable, table_axes
+from salary_cube import CUBE_DIMENSIONS, SalaryCube
+from salary_store import SalaryStore
+from tree_engine import scoring_model
+
 warnings.filterwarnings('ignore')
 
+# The session's first run is timed until a tab is on screen, across reruns that
+# interrupt it before then
+startup = startup_report.begin_run(st.session_state.get('startup_started'))
+st.session_state.setdefault('startup_started', startup.start)
+startup.mark('imports')
+
 # Set page configuration
 st.set_page_config(
     page_title="Data Science Salary Explorer",
@@ -356,49 +367,56 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-@st.cache_data
+# cache_resource shares one read-only store across reruns and sessions instead of
+# handing every rerun its own deserialized copy of the frame
+@st.cache_resource
 def load_data():
-    df = pd.read_csv('salaries.csv')
-    # Convert salary_in_usd to numeric, handling any errors
-    df['salary_in_usd'] = pd.to_numeric(df['salary_in_usd'], errors='coerce')
-    
-    # Remove outliers with salaries above 800,000 USD
-    df = df[df['salary_in_usd'] <= 800000]
-    
-    # Create experience level mapping for better readability
-    df['experience_level_full'] = df['experience_level'].map({
-        'EN': 'Entry Level',
-        'MI': 'Mid Level',
-        'SE': 'Senior Level',
-        'EX': 'Executive Level'
-    })
-    
-    # Create employment type mapping
-    df['employment_type_full'] = df['employment_type'].map({
-        'FT': 'Full Time',
-        'PT': 'Part Time',
-        'CT': 'Contract',
-        'FL': 'Freelance'
-    })
-    
-    # Create remote ratio mapping
-    df['remote_work'] = df['remote_ratio'].map({
-        0: 'On-site',
-        50: 'Hybrid',
-        100: 'Remote'
-    })
-    
-    # Create company size mapping
-    df['company_size_full'] = df['company_size'].map({
-        'S': 'Small',
-        'M': 'Medium',
-        'L': 'Large'
-    })
-    
-    return df
+    """Load the salary store: the cleaned base CSV plus any appended delta files"""
+    # Parsing, outlier removal and the *_full label columns live in ingest.py;
+    # warm starts reload the typed columnar sidecar instead of the CSV
+    return SalaryStore('salaries.csv')
+
+@st.cache_resource
+def load_models(dataset_fingerprint, _training_df):
+    """Load the model bundle for a training snapshot from the on-disk registry"""
+    # Keyed by the snapshot fingerprint only (the underscore argument is not hashed),
+    # so reruns never re-hash the training data; a registry miss trains once and
+    # saves the bundle for every other process
+    bundle, _ = ModelRegistry().load_or_train(_training_df, dataset_fingerprint)
+    return bundle
 
-# Load the data
-df = load_data()
+@st.cache_resource
+def load_explainer(artifact_key, model_name, _bundle):
+    """TreeSHAP explainer for one model artifact; starts the background test-set pass"""
+    return ModelExplainer(_bundle['trained_models'][model_name], _bundle['X_test'])
+
+@st.cache_resource
+def load_prediction_table(artifact_key, model_name, _bundle, _domain):
+    """Precompute one model's predictions over the form's feature space"""
+    # Keyed by the model artifact key, so a retrained or reloaded bundle gets a
+    # fresh table instead of serving predictions from the old models
+    axes = table_axes(_bundle['label_encoders'], _domain, DEFAULT_SUBSET)
+    return PredictionTable(_bundle, model_name, axes)
+
+@st.cache_resource
+def load_figure_cache():
+    """Serialized dashboard figures shared by every session of this server process"""
+    return FigureCache()
+
+# Per-stage timings for this run; the switches live in the sidebar "Performance"
+# expander at the end of the script and reach this run through session state
+profile = profiling.begin_run(
+    profile=st.session_state.get('profile_run', False),
+    trace_memory=st.session_state.get('profile_memory', False),
+)
+
+# Load the data, folding in any delta CSVs dropped since the last rerun
+with profile.stage('data load'):
+    store = load_data()
+    data = store.refresh()
+df, domain = data.df, data.domain
+filter_index, salary_cube = data.filter_index, data.cube
+startup.mark('data load')
 
 # Header and Introduction
 st.markdown('<h1 class="main-header">Data Science Salary Explorer</h1>', unsafe_allow_html=True)
@@ -438,12 +456,12 @@ st.sidebar.markdown("""<p style='font-size: 0.9rem; color: #4b5563; margin-botto
 # Create filter sections with expanders for better organization
 with st.sidebar.expander("📅 Time Period", expanded=True):
     # Year filter
-    years = sorted(df['work_year'].unique())
+    years = domain['years']
     selected_years = st.multiselect("Select Years", years, default=years, help="Filter data by work year")
 
 with st.sidebar.expander("👨‍💼 Professional Details", expanded=True):
     # Experience level filter with better labels
-    experience_options = df['experience_level_full'].dropna().unique()
+    experience_options = domain['experience_labels']
     selected_experience = st.multiselect(
         "Experience Level", 
         experience_options, 
@@ -452,7 +470,7 @@ with st.sidebar.expander("👨‍💼 Professional Details", expanded=True):
     )
     
     # Job title filter with search functionality
-    job_titles = sorted(df['job_title'].unique())
+    job_titles = domain['job_titles']
     job_title_search = st.text_input("Search Job Titles", "", help="Type to search for specific job titles")
     
     # Filter job titles based on search input
@@ -470,7 +488,7 @@ with st.sidebar.expander("👨‍💼 Professional Details", expanded=True):
 
 with st.sidebar.expander("🏢 Company Information", expanded=True):
     # Remote work filter
-    remote_options = df['remote_work'].dropna().unique()
+    remote_options = domain['remote_labels']
     selected_remote = st.multiselect(
         "Work Arrangement", 
         remote_options, 
@@ -479,7 +497,7 @@ with st.sidebar.expander("🏢 Company Information", expanded=True):
     )
     
     # Company size filter
-    company_size_options = df['company_size_full'].dropna().unique()
+    company_size_options = domain['company_size_labels']
     selected_company_size = st.multiselect(
         "Company Size", 
         company_size_options, 
@@ -488,7 +506,7 @@ with st.sidebar.expander("🏢 Company Information", expanded=True):
     )
     
     # Location filter with search functionality
-    locations = sorted(df['company_location'].unique())
+    locations = domain['locations']
     location_search = st.text_input("Search Locations", "", help="Type to search for specific countries")
     
     # Filter locations based on search input
@@ -506,8 +524,8 @@ with st.sidebar.expander("🏢 Company Information", expanded=True):
 
 with st.sidebar.expander("💰 Compensation", expanded=True):
     # Salary range filter with formatted values
-    min_salary = int(df['salary_in_usd'].min())
-    max_salary = int(df['salary_in_usd'].max())
+    min_salary = domain['min_salary']
+    max_salary = domain['max_salary']
     
     st.markdown(f"""<p style='font-size: 0.85rem; color: #4b5563;'>Range: ${min_salary:,} - ${max_salary:,}</p>""", unsafe_allow_html=True)
     
@@ -522,599 +540,685 @@ with st.sidebar.expander("💰 Compensation", expanded=True):
     # Display selected range with formatting
     st.markdown(f"""<p style='font-size: 0.9rem; color: #1e3a8a; font-weight: 500;'>Selected: ${salary_range[0]:,} - ${salary_range[1]:,}</p>""", unsafe_allow_html=True)
 
-# Apply filters
-filtered_df = df.copy()
+# Apply filters through the bitmap index; tabs pull only the columns they need
+filter_selections = {
+    'years': selected_years,
+    'experience': selected_experience,
+    'job_titles': selected_job_titles,
+    'remote': selected_remote,
+    'company_size': selected_company_size,
+    'locations': selected_locations,
+}
+with profile.stage('filters'):
+    filtered_view = filter_index.select(filter_selections, salary_range)
 
-if selected_years:
-    filtered_df = filtered_df[filtered_df['work_year'].isin(selected_years)]
-    
-if selected_experience:
-    filtered_df = filtered_df[filtered_df['experience_level_full'].isin(selected_experience)]
-    
-if selected_job_titles:
-    filtered_df = filtered_df[filtered_df['job_title'].isin(selected_job_titles)]
-    
-if selected_remote:
-    filtered_df = filtered_df[filtered_df['remote_work'].isin(selected_remote)]
-    
-if selected_company_size:
-    filtered_df = filtered_df[filtered_df['company_size_full'].isin(selected_company_size)]
-    
-if selected_locations:
-    filtered_df = filtered_df[filtered_df['company_location'].isin(selected_locations)]
-    
-filtered_df = filtered_df[(filtered_df['salary_in_usd'] >= salary_range[0]) & 
-                          (filtered_df['salary_in_usd'] <= salary_range[1])]
+    # Aggregates come from the pre-built cube; salary is not a cube dimension, so a
+    # narrowed salary range falls back to a cube over just the filtered rows
+    if salary_range == (domain['min_salary'], domain['max_salary']):
+        filtered_cube = salary_cube.slice(filter_selections)
+    else:
+        filtered_cube = SalaryCube(filtered_view.frame(*CUBE_DIMENSIONS, 'salary_in_usd')).slice()
+        if data.sample_rate < 1.0:
+            # Out of core the rows are a sample; count them as the rows they stand for
+            filtered_cube = filtered_cube.scaled(1 / data.sample_rate)
+
+# Medians and percentiles come from merged quantile sketches (within 1% of the
+# exact value); the exact toggle recomputes them from the filtered rows instead
+exact_percentiles = st.sidebar.checkbox(
+    "Exact percentiles",
+    value=False,
+    help="Compute medians and quartiles from every filtered row instead of the ±1% quantile sketches"
+)
+
+def group_medians(column):
+    """Median salary per value of ``column`` over the filtered rows"""
+    if not exact_percentiles:
+        return filtered_cube.group_quantile(column, 0.5, name='median')
+    frame = filtered_view.frame(column, 'salary_in_usd')
+    return frame.groupby(column, observed=True)['salary_in_usd'].median().rename('median').reset_index()
+
+# Canonical key of everything a tab's aggregates depend on
+filter_state = (
+    data.fingerprint,
+    tuple((name, tuple(sorted(map(str, values)))) for name, values in filter_selections.items()),
+    tuple(salary_range),
+    exact_percentiles,
+)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def memoised(tab, state, _prepare):
+    """Result of a tab's ``_prepare()`` under a filter state, shared across reruns and sessions"""
+    # Only (tab, state) is hashed; the callable just computes the value on a miss
+    return _prepare()
+
+def tab_data(tab, prepare):
+    """Chart data for ``tab`` under the current filter state, timed as one profiling stage"""
+    with profile.stage(f'tab data: {tab}'):
+        return memoised(tab, filter_state, prepare)
+
+# Dashboard charts are cached as figure JSON under the hashed filter state
+figures = load_figure_cache()
+figure_key = state_key(filter_state)
+
+def cached_figure(chart, build):
+    """Dashboard figure ``chart`` for the current filter state"""
+    with profile.stage(f'figure: {chart}'):
+        return figures.figure(figure_key, chart, build)
 
 # Display dataset info
 st.sidebar.markdown("## Dataset Information")
-st.sidebar.info(f"Total Records: {len(df)}\nFiltered Records: {len(filtered_df)}")
+st.sidebar.info(f"Total Records: {data.n_rows}\nFiltered Records: {filtered_cube.count}")
+if data.sample_rate < 1.0:
+    st.sidebar.caption(
+        f"Out-of-core mode: charts aggregate every row; row-level views and model training "
+        f"use a {data.sample_rate:.2%} sample ({len(df):,} rows)"
+    )
+if data.deltas:
+    appended = sum(added for _, added, _ in data.deltas)
+    rejected = sum(dropped for _, _, dropped in data.deltas)
+    st.sidebar.caption(f"Appended {appended:,} rows from {len({name for name, _, _ in data.deltas})} delta file(s); {rejected:,} invalid rows skipped")
+for name, message in store.errors.items():
+    st.sidebar.warning(f"Skipped delta file {name}: {message}")
 
 # Main dashboard content
-tabs = st.tabs(["Overview", "Salary Analysis", "Job Roles", "Geographical Analysis", "Experience Impact", "Salary Predictor"])
+TAB_NAMES = ["Overview", "Salary Analysis", "Job Roles", "Geographical Analysis", "Experience Impact", "Salary Predictor"]
+# st.tabs would execute all six tab bodies on every rerun; a horizontal selector
+# runs only the active one, so an interaction costs one tab's work
+active_tab = st.radio("Section", TAB_NAMES, horizontal=True, label_visibility="collapsed", key="active_tab")
 
 # Overview Tab
-with tabs[0]:
+if active_tab == 'Overview':
     st.markdown('<h2 class="sub-header">Salary Overview</h2>', unsafe_allow_html=True)
     
     # Enhanced key metrics with icons and additional insights
-st.markdown("""<div class="chart-container">""", unsafe_allow_html=True)
+    st.markdown("""<div class="chart-container">""", unsafe_allow_html=True)
 
-# Calculate additional metrics
-avg_salary = filtered_df['salary_in_usd'].mean()
-median_salary = filtered_df['salary_in_usd'].median()
-max_salary = filtered_df['salary_in_usd'].max()
-min_salary = filtered_df['salary_in_usd'].min()
-std_salary = filtered_df['salary_in_usd'].std()
+    def prepare_overview():
+        # Calculate median and percentiles for context
+        if exact_percentiles:
+            quartiles = filtered_view.column('salary_in_usd').quantile([0.25, 0.5, 0.75]).tolist()
+        else:
+            quartiles = list(filtered_cube.quantiles([0.25, 0.5, 0.75]))
+        
+        # Top job titles by count
+        job_count = filtered_cube.rollup('job_title')[['job_title', 'count']]
+        job_count = job_count.sort_values('count', ascending=False).head(10)
+        return filtered_cube.total(), quartiles, job_count
+    
+    overall, (p25, median_salary, p75), job_count = tab_data('Overview', prepare_overview)
 
-# Calculate percentiles for context
-p25 = filtered_df['salary_in_usd'].quantile(0.25)
-p75 = filtered_df['salary_in_usd'].quantile(0.75)
-iqr = p75 - p25
+    # Calculate additional metrics
+    avg_salary = overall['mean']
+    max_salary = overall['max']
+    min_salary = overall['min']
+    std_salary = overall['std']
+    iqr = p75 - p25
 
-# Create a more visually appealing metrics display
-col1, col2, col3, col4 = st.columns(4)
+    # Create a more visually appealing metrics display
+    col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    st.markdown(f'''
-    <div class="metric-container">
-        <div style="display: flex; align-items: center;">
-            <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">💰</div>
-            <div>
-                <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Average Salary</p>
-                <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${avg_salary:,.0f}</p>
-                <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Standard Deviation: ${std_salary:,.0f}</p>
+    with col1:
+        st.markdown(f'''
+        <div class="metric-container">
+            <div style="display: flex; align-items: center;">
+                <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">💰</div>
+                <div>
+                    <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Average Salary</p>
+                    <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${avg_salary:,.0f}</p>
+                    <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Standard Deviation: ${std_salary:,.0f}</p>
+                </div>
             </div>
         </div>
-    </div>
-    ''', unsafe_allow_html=True)
+        ''', unsafe_allow_html=True)
     
-with col2:
-    st.markdown(f'''
-    <div class="metric-container">
-        <div style="display: flex; align-items: center;">
-            <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">📊</div>
-            <div>
-                <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Median Salary</p>
-                <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${median_salary:,.0f}</p>
-                <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Middle value in distribution</p>
+    with col2:
+        st.markdown(f'''
+        <div class="metric-container">
+            <div style="display: flex; align-items: center;">
+                <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">📊</div>
+                <div>
+                    <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Median Salary</p>
+                    <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${median_salary:,.0f}</p>
+                    <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Middle value in distribution</p>
+                </div>
             </div>
         </div>
-    </div>
-    ''', unsafe_allow_html=True)
+        ''', unsafe_allow_html=True)
     
-with col3:
-    st.markdown(f'''
-    <div class="metric-container">
-        <div style="display: flex; align-items: center;">
-            <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">🔼</div>
-            <div>
-                <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Highest Salary</p>
-                <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${max_salary:,.0f}</p>
-                <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Top earner in dataset</p>
+    with col3:
+        st.markdown(f'''
+        <div class="metric-container">
+            <div style="display: flex; align-items: center;">
+                <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">🔼</div>
+                <div>
+                    <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Highest Salary</p>
+                    <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${max_salary:,.0f}</p>
+                    <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Top earner in dataset</p>
+                </div>
             </div>
         </div>
-    </div>
-    ''', unsafe_allow_html=True)
+        ''', unsafe_allow_html=True)
     
-with col4:
-    st.markdown(f'''
-    <div class="metric-container">
-        <div style="display: flex; align-items: center;">
-            <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">🔽</div>
-            <div>
-                <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Lowest Salary</p>
-                <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${min_salary:,.0f}</p>
-                <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Entry point in dataset</p>
+    with col4:
+        st.markdown(f'''
+        <div class="metric-container">
+            <div style="display: flex; align-items: center;">
+                <div style="font-size: 2rem; margin-right: 15px; color: var(--primary-color);">🔽</div>
+                <div>
+                    <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Lowest Salary</p>
+                    <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary-color); margin: 0; display: block;">${min_salary:,.0f}</p>
+                    <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Entry point in dataset</p>
+                </div>
             </div>
         </div>
+        ''', unsafe_allow_html=True)
+
+    # Add salary distribution context
+    st.markdown(f'''
+    <div style="padding: 15px; background-color: var(--bg-tertiary); border-radius: 8px; margin-top: 15px;">
+        <p style="font-weight: 600; margin-bottom: 8px; display: block; color: var(--text-primary);">Salary Distribution Insights:</p>
+        <ul style="margin: 0; padding-left: 20px;">
+            <li style="margin-bottom: 5px; display: list-item; color: var(--text-secondary);">Middle 50% of salaries fall between <b>${p25:,.0f}</b> and <b>${p75:,.0f}</b></li>
+            <li style="margin-bottom: 5px; display: list-item; color: var(--text-secondary);">Interquartile Range (IQR): <b>${iqr:,.0f}</b></li>
+            <li style="display: list-item; color: var(--text-secondary);">Salary Range Spread: <b>${max_salary-min_salary:,.0f}</b></li>
+        </ul>
     </div>
     ''', unsafe_allow_html=True)
 
-# Add salary distribution context
-st.markdown(f'''
-<div style="padding: 15px; background-color: var(--bg-tertiary); border-radius: 8px; margin-top: 15px;">
-    <p style="font-weight: 600; margin-bottom: 8px; display: block; color: var(--text-primary);">Salary Distribution Insights:</p>
-    <ul style="margin: 0; padding-left: 20px;">
-        <li style="margin-bottom: 5px; display: list-item; color: var(--text-secondary);">Middle 50% of salaries fall between <b>${p25:,.0f}</b> and <b>${p75:,.0f}</b></li>
-        <li style="margin-bottom: 5px; display: list-item; color: var(--text-secondary);">Interquartile Range (IQR): <b>${iqr:,.0f}</b></li>
-        <li style="display: list-item; color: var(--text-secondary);">Salary Range Spread: <b>${max_salary-min_salary:,.0f}</b></li>
-    </ul>
-</div>
-''', unsafe_allow_html=True)
+    st.markdown("""</div>""", unsafe_allow_html=True)
 
-st.markdown("""</div>""", unsafe_allow_html=True)
+    # Enhanced Salary distribution with annotations
+    st.markdown('<h3 class="sub-header">Salary Distribution</h3>', unsafe_allow_html=True)
 
-# Enhanced Salary distribution with annotations
-st.markdown('<h3 class="sub-header">Salary Distribution</h3>', unsafe_allow_html=True)
-
-# Create a more visually appealing histogram with annotations
-fig = px.histogram(
-    filtered_df, 
-    x="salary_in_usd", 
-    nbins=50,
-    title="Salary Distribution in USD",
-    color_discrete_sequence=['#3b82f6'],
-    opacity=0.8
-)
-
-# Add mean and median lines
-fig.add_vline(x=avg_salary, line_dash="dash", line_color="#ef4444", annotation_text=f"Mean: ${avg_salary:,.0f}", 
-              annotation_position="top right", annotation_font_color="#ef4444", annotation_font_size=12)
-fig.add_vline(x=median_salary, line_dash="dash", line_color="#10b981", annotation_text=f"Median: ${median_salary:,.0f}", 
-              annotation_position="top left", annotation_font_color="#10b981", annotation_font_size=12)
-
-# Enhance layout
-fig.update_layout(
-    xaxis_title="Salary (USD)",
-    yaxis_title="Count",
-    height=500,
-    plot_bgcolor="rgba(0,0,0,0)",
-    paper_bgcolor="rgba(0,0,0,0)",
-    margin=dict(l=20, r=20, t=40, b=20),
-    font=dict(family="Arial, sans-serif", size=12),
-    hoverlabel=dict(font_size=12, font_family="Arial, sans-serif"),
-    xaxis=dict(
-        tickformat="$,.0f",
-        gridcolor="#e5e7eb",
-        showgrid=True,
-    ),
-    yaxis=dict(
-        gridcolor="#e5e7eb",
-        showgrid=True,
-    ),
-)
+    # Create a more visually appealing histogram with annotations
+    def salary_histogram_chart():
+        # Binned on the server: the figure carries 50 bars, not every filtered salary
+        fig = binned_histogram(
+            filtered_view.column('salary_in_usd').to_numpy(),
+            50,
+            title="Salary Distribution in USD",
+            color='#3b82f6',
+            opacity=0.8,
+            weight=1 / data.sample_rate
+        )
 
-st.plotly_chart(fig, use_container_width=True)
+        # Add mean and median lines
+        fig.add_vline(x=avg_salary, line_dash="dash", line_color="#ef4444", annotation_text=f"Mean: ${avg_salary:,.0f}", 
+                      annotation_position="top right", annotation_font_color="#ef4444", annotation_font_size=12)
+        fig.add_vline(x=median_salary, line_dash="dash", line_color="#10b981", annotation_text=f"Median: ${median_salary:,.0f}", 
+                      annotation_position="top left", annotation_font_color="#10b981", annotation_font_size=12)
 
-# Top job titles by count
-st.markdown('<h3 class="sub-header">Most Common Job Titles</h3>', unsafe_allow_html=True)
+        # Enhance layout
+        fig.update_layout(
+            xaxis_title="Salary (USD)",
+            yaxis_title="Count",
+            height=500,
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            margin=dict(l=20, r=20, t=40, b=20),
+            font=dict(family="Arial, sans-serif", size=12),
+            hoverlabel=dict(font_size=12, font_family="Arial, sans-serif"),
+            xaxis=dict(
+                tickformat="$,.0f",
+                gridcolor="#e5e7eb",
+                showgrid=True,
+            ),
+            yaxis=dict(
+                gridcolor="#e5e7eb",
+                showgrid=True,
+            ),
+        )
+        return fig
+    
+    st.plotly_chart(cached_figure('salary_histogram', salary_histogram_chart), use_container_width=True)
 
-job_count = filtered_df['job_title'].value_counts().reset_index()
-job_count.columns = ['job_title', 'count']
-job_count = job_count.sort_values('count', ascending=False).head(10)
+    # Top job titles by count
+    st.markdown('<h3 class="sub-header">Most Common Job Titles</h3>', unsafe_allow_html=True)
 
-fig = px.bar(
-    job_count,
-    x='count',
-    y='job_title',
-    orientation='h',
-    title="Top 10 Most Common Job Titles",
-    color='count',
-    color_continuous_scale='Blues',
-)
-fig.update_layout(
-    xaxis_title="Number of Positions",
-    yaxis_title="Job Title",
-    height=500,
-    yaxis={'categoryorder':'total ascending'}
-)
-st.plotly_chart(fig, use_container_width=True)
+    def job_title_counts_chart():
+        fig = px.bar(
+            job_count,
+            x='count',
+            y='job_title',
+            orientation='h',
+            title="Top 10 Most Common Job Titles",
+            color='count',
+            color_continuous_scale='Blues',
+        )
+        fig.update_layout(
+            xaxis_title="Number of Positions",
+            yaxis_title="Job Title",
+            height=500,
+            yaxis={'categoryorder':'total ascending'}
+        )
+        return fig
+    
+    st.plotly_chart(cached_figure('job_title_counts', job_title_counts_chart), use_container_width=True)
 
 # Salary Analysis Tab
-with tabs[1]:
+if active_tab == 'Salary Analysis':
     st.markdown('<h2 class="sub-header">Salary Analysis</h2>', unsafe_allow_html=True)
     
+    def prepare_salary_analysis():
+        exp_salary = filtered_cube.rollup('experience_level_full').merge(
+            group_medians('experience_level_full'), on='experience_level_full'
+        )[['experience_level_full', 'mean', 'median', 'min', 'max']]
+        exp_salary.columns = ['Experience Level', 'Mean Salary', 'Median Salary', 'Min Salary', 'Max Salary']
+        
+        # Sort by experience level in logical order
+        exp_order = {'Entry Level': 0, 'Mid Level': 1, 'Senior Level': 2, 'Executive Level': 3}
+        exp_salary['order'] = exp_salary['Experience Level'].map(exp_order)
+        exp_salary = exp_salary.sort_values('order').drop('order', axis=1)
+        
+        size_salary = filtered_cube.rollup('company_size_full').merge(
+            group_medians('company_size_full'), on='company_size_full'
+        )[['company_size_full', 'mean', 'median']]
+        size_salary.columns = ['Company Size', 'Mean Salary', 'Median Salary']
+        
+        # Sort by company size in logical order
+        size_order = {'Small': 0, 'Medium': 1, 'Large': 2}
+        size_salary['order'] = size_salary['Company Size'].map(size_order)
+        size_salary = size_salary.sort_values('order').drop('order', axis=1)
+        
+        remote_salary = filtered_cube.rollup('remote_work').merge(
+            group_medians('remote_work'), on='remote_work'
+        )[['remote_work', 'mean', 'median']]
+        remote_salary.columns = ['Remote Status', 'Mean Salary', 'Median Salary']
+        return exp_salary, size_salary, remote_salary
+    
+    exp_salary, size_salary, remote_salary = tab_data('Salary Analysis', prepare_salary_analysis)
+    
     # Salary by experience level
     st.markdown('<h3 class="sub-header">Salary by Experience Level</h3>', unsafe_allow_html=True)
     
-    exp_salary = filtered_df.groupby('experience_level_full')['salary_in_usd'].agg(['mean', 'median', 'min', 'max']).reset_index()
-    exp_salary.columns = ['Experience Level', 'Mean Salary', 'Median Salary', 'Min Salary', 'Max Salary']
-    
-    # Sort by experience level in logical order
-    exp_order = {'Entry Level': 0, 'Mid Level': 1, 'Senior Level': 2, 'Executive Level': 3}
-    exp_salary['order'] = exp_salary['Experience Level'].map(exp_order)
-    exp_salary = exp_salary.sort_values('order').drop('order', axis=1)
-    
-    fig = px.bar(
-        exp_salary,
-        x='Experience Level',
-        y=['Mean Salary', 'Median Salary'],
-        barmode='group',
-        title="Average and Median Salary by Experience Level",
-        color_discrete_sequence=['#0083B8', '#00B0B9']
-    )
-    fig.update_layout(
-        xaxis_title="Experience Level",
-        yaxis_title="Salary (USD)",
-        height=500,
-        legend_title="Metric"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    def experience_salary_chart():
+        fig = px.bar(
+            exp_salary,
+            x='Experience Level',
+            y=['Mean Salary', 'Median Salary'],
+            barmode='group',
+            title="Average and Median Salary by Experience Level",
+            color_discrete_sequence=['#0083B8', '#00B0B9']
+        )
+        fig.update_layout(
+            xaxis_title="Experience Level",
+            yaxis_title="Salary (USD)",
+            height=500,
+            legend_title="Metric"
+        )
+        return fig
+    
+    st.plotly_chart(cached_figure('experience_salary', experience_salary_chart), use_container_width=True)
     
     # Salary by company size
     st.markdown('<h3 class="sub-header">Salary by Company Size</h3>', unsafe_allow_html=True)
     
-    size_salary = filtered_df.groupby('company_size_full')['salary_in_usd'].agg(['mean', 'median']).reset_index()
-    size_salary.columns = ['Company Size', 'Mean Salary', 'Median Salary']
-    
-    # Sort by company size in logical order
-    size_order = {'Small': 0, 'Medium': 1, 'Large': 2}
-    size_salary['order'] = size_salary['Company Size'].map(size_order)
-    size_salary = size_salary.sort_values('order').drop('order', axis=1)
-    
-    fig = px.bar(
-        size_salary,
-        x='Company Size',
-        y=['Mean Salary', 'Median Salary'],
-        barmode='group',
-        title="Average and Median Salary by Company Size",
-        color_discrete_sequence=['#0083B8', '#00B0B9']
-    )
-    fig.update_layout(
-        xaxis_title="Company Size",
-        yaxis_title="Salary (USD)",
-        height=500,
-        legend_title="Metric"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    def company_size_salary_chart():
+        fig = px.bar(
+            size_salary,
+            x='Company Size',
+            y=['Mean Salary', 'Median Salary'],
+            barmode='group',
+            title="Average and Median Salary by Company Size",
+            color_discrete_sequence=['#0083B8', '#00B0B9']
+        )
+        fig.update_layout(
+            xaxis_title="Company Size",
+            yaxis_title="Salary (USD)",
+            height=500,
+            legend_title="Metric"
+        )
+        return fig
+    
+    st.plotly_chart(cached_figure('company_size_salary', company_size_salary_chart), use_container_width=True)
     
     # Salary by remote work
     st.markdown('<h3 class="sub-header">Salary by Remote Work Status</h3>', unsafe_allow_html=True)
     
-    remote_salary = filtered_df.groupby('remote_work')['salary_in_usd'].agg(['mean', 'median']).reset_index()
-    remote_salary.columns = ['Remote Status', 'Mean Salary', 'Median Salary']
+    def remote_salary_chart():
+        fig = px.bar(
+            remote_salary,
+            x='Remote Status',
+            y=['Mean Salary', 'Median Salary'],
+            barmode='group',
+            title="Average and Median Salary by Remote Work Status",
+            color_discrete_sequence=['#0083B8', '#00B0B9']
+        )
+        fig.update_layout(
+            xaxis_title="Remote Work Status",
+            yaxis_title="Salary (USD)",
+            height=500,
+            legend_title="Metric"
+        )
+        return fig
     
-    fig = px.bar(
-        remote_salary,
-        x='Remote Status',
-        y=['Mean Salary', 'Median Salary'],
-        barmode='group',
-        title="Average and Median Salary by Remote Work Status",
-        color_discrete_sequence=['#0083B8', '#00B0B9']
-    )
-    fig.update_layout(
-        xaxis_title="Remote Work Status",
-        yaxis_title="Salary (USD)",
-        height=500,
-        legend_title="Metric"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('remote_salary', remote_salary_chart), use_container_width=True)
 
 # Job Roles Tab
-with tabs[2]:
+if active_tab == 'Job Roles':
     st.markdown('<h2 class="sub-header">Job Role Analysis</h2>', unsafe_allow_html=True)
     
+    def prepare_job_roles():
+        # Only include job titles with at least 5 entries for statistical significance
+        job_rollup = filtered_cube.rollup('job_title')
+        job_salary = job_rollup[['job_title', 'mean', 'count']]
+        job_salary = job_salary[job_salary['count'] >= 5].sort_values('mean', ascending=False).head(15)
+        job_salary.columns = ['Job Title', 'Average Salary', 'Count']
+        
+        # Top 10 most common job titles
+        top_jobs = job_rollup.nlargest(10, 'count')['job_title'].tolist()
+        
+        # Quartiles and whiskers per title, so the box plot ships ten boxes rather than every salary
+        if exact_percentiles:
+            job_df = filtered_view.frame('job_title', 'salary_in_usd')
+            job_boxes = box_stats(job_df[job_df['job_title'].isin(top_jobs)], 'job_title')
+        else:
+            job_boxes = cube_box_stats(filtered_cube.restrict('job_title', top_jobs), 'job_title')
+        return job_salary, top_jobs, job_boxes
+    
+    job_salary, top_jobs, job_boxes = tab_data('Job Roles', prepare_job_roles)
+    
     # Enhanced Top 10 most common job titles with salary information
     st.markdown('<h3 class="sub-header">Top Paying Job Titles</h3>', unsafe_allow_html=True)
     st.markdown('<p class="chart-description">Analysis of the highest paying job titles with statistical significance (minimum 5 entries).</p>', unsafe_allow_html=True)
     
-    # Only include job titles with at least 5 entries for statistical significance
-    job_salary = filtered_df.groupby('job_title')['salary_in_usd'].agg(['mean', 'count']).reset_index()
-    job_salary = job_salary[job_salary['count'] >= 5].sort_values('mean', ascending=False).head(15)
-    job_salary.columns = ['Job Title', 'Average Salary', 'Count']
-    
     # Create a more informative and visually appealing bar chart
-    fig = px.bar(
-        job_salary,
-        x='Average Salary',
-        y='Job Title',
-        orientation='h',
-        title="Top 15 Highest Paying Job Titles (with at least 5 entries)",
-        color='Average Salary',
-        color_continuous_scale='Blues',
-        hover_data=['Count'],
-        text_auto='.2s'
-    )
+    def top_paying_jobs_chart():
+        fig = px.bar(
+            job_salary,
+            x='Average Salary',
+            y='Job Title',
+            orientation='h',
+            title="Top 15 Highest Paying Job Titles (with at least 5 entries)",
+            color='Average Salary',
+            color_continuous_scale='Blues',
+            hover_data=['Count'],
+            text_auto='.2s'
+        )
     
-    # Update layout for a more professional look
-    fig.update_layout(
-        xaxis_title="Average Salary (USD)",
-        yaxis_title="Job Title",
-        height=600,
-        yaxis={'categoryorder':'total ascending'},
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Arial, sans-serif"),
-        hoverlabel=dict(font_size=12, font_family="Arial, sans-serif"),
-        xaxis=dict(
-            tickformat="$,.0f",
-            gridcolor="#e5e7eb",
-            showgrid=True,
+        # Update layout for a more professional look
+        fig.update_layout(
+            xaxis_title="Average Salary (USD)",
+            yaxis_title="Job Title",
+            height=600,
+            yaxis={'categoryorder':'total ascending'},
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            font=dict(family="Arial, sans-serif"),
+            hoverlabel=dict(font_size=12, font_family="Arial, sans-serif"),
+            xaxis=dict(
+                tickformat="$,.0f",
+                gridcolor="#e5e7eb",
+                showgrid=True,
+            )
         )
-    )
     
-    # Update traces for better visualization
-    fig.update_traces(
-        texttemplate='$%{x:,.0f}',
-        textposition='inside',
-        marker_line_color='#e5e7eb',
-        marker_line_width=1
-    )
+        # Update traces for better visualization
+        fig.update_traces(
+            texttemplate='$%{x:,.0f}',
+            textposition='inside',
+            marker_line_color='#e5e7eb',
+            marker_line_width=1
+        )
+        return fig
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('top_paying_jobs', top_paying_jobs_chart), use_container_width=True)
     
     # Salary range by job title
     st.markdown('<h3 class="sub-header">Salary Range by Popular Job Titles</h3>', unsafe_allow_html=True)
     
-    # Get top 10 most common job titles
-    top_jobs = filtered_df['job_title'].value_counts().head(10).index.tolist()
-    top_jobs_df = filtered_df[filtered_df['job_title'].isin(top_jobs)]
-    
-    fig = px.box(
-        top_jobs_df,
-        x='job_title',
-        y='salary_in_usd',
-        title="Salary Range for Most Common Job Titles",
-        color='job_title',
-        color_discrete_sequence=px.colors.qualitative.Bold
-    )
-    fig.update_layout(
-        xaxis_title="Job Title",
-        yaxis_title="Salary (USD)",
-        height=600,
-        showlegend=False,
-        xaxis={'categoryorder':'array', 'categoryarray':top_jobs}
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    def job_salary_ranges_chart():
+        fig = summary_box(
+            job_boxes,
+            'job_title',
+            order=top_jobs,
+            colors=px.colors.qualitative.Bold,
+            title="Salary Range for Most Common Job Titles"
+        )
+        fig.update_layout(
+            xaxis_title="Job Title",
+            yaxis_title="Salary (USD)",
+            height=600,
+            showlegend=False,
+            xaxis={'categoryorder':'array', 'categoryarray':top_jobs}
+        )
+        return fig
+    
+    st.plotly_chart(cached_figure('job_salary_ranges', job_salary_ranges_chart), use_container_width=True)
 
 # Geographical Analysis Tab
-with tabs[3]:
+if active_tab == 'Geographical Analysis':
     st.markdown('<h2 class="sub-header">Geographical Analysis</h2>', unsafe_allow_html=True)
     
+    def prepare_geography():
+        # Only include locations with at least 5 entries
+        location_salary = filtered_cube.rollup('company_location').merge(
+            group_medians('company_location'), on='company_location'
+        )[['company_location', 'mean', 'median', 'std', 'count']]
+        
+        # Rename to display columns
+        location_salary.columns = ['Country Code', 'Average Salary', 'Median Salary', 'Salary Std Dev', 'Count']
+        location_salary['Country Code'] = location_salary['Country Code'].astype(str)
+        location_salary = location_salary[location_salary['Count'] >= 5].sort_values('Average Salary', ascending=False)
+        
+        # ISO codes, country names and hover labels come from the full ISO 3166 table,
+        # joined per country rather than formatted row by row
+        location_salary = country_table(location_salary, 'Country Code')
+        
+        # Get top 10 countries by count
+        top_countries_by_count = filtered_cube.rollup('company_location').nlargest(10, 'count')['company_location'].tolist()
+        
+        # Filter data for these countries
+        country_comparison = filtered_cube.restrict('company_location', top_countries_by_count)
+        
+        # Calculate average salary by employee residence and company location
+        emp_residence = country_comparison.rollup('employee_residence')[['employee_residence', 'mean']]
+        emp_residence.columns = ['Country', 'Average Salary']
+        emp_residence['Type'] = 'Employee Residence'
+        
+        comp_location = country_comparison.rollup('company_location')[['company_location', 'mean']]
+        comp_location.columns = ['Country', 'Average Salary']
+        comp_location['Type'] = 'Company Location'
+        
+        combined = pd.concat([emp_residence, comp_location])
+        return location_salary, combined
+    
+    location_salary, combined = tab_data('Geographical Analysis', prepare_geography)
+    
     # Average salary by location
     st.markdown('<h3 class="sub-header">Average Salary by Location</h3>', unsafe_allow_html=True)
     st.markdown('<p class="chart-description">Interactive world map showing average data science salaries by country with detailed statistics.</p>', unsafe_allow_html=True)
     
-    # Only include locations with at least 5 entries
-    location_salary = filtered_df.groupby('company_location').agg({
-        'salary_in_usd': ['mean', 'median', 'std', 'count']
-    }).reset_index()
-    
-    # Flatten the multi-level columns
-    location_salary.columns = ['Country Code', 'Average Salary', 'Median Salary', 'Salary Std Dev', 'Count']
-    location_salary = location_salary[location_salary['Count'] >= 5].sort_values('Average Salary', ascending=False)
-    
-    # Create a dictionary for 2-letter to 3-letter country code conversion
-    # This is necessary because Plotly's choropleth requires ISO 3166-1 alpha-3 format
-    country_code_map = {
-        'US': 'USA', 'GB': 'GBR', 'CA': 'CAN', 'DE': 'DEU', 'ES': 'ESP',
-        'FR': 'FRA', 'IN': 'IND', 'NL': 'NLD', 'AU': 'AUS', 'JP': 'JPN',
-        'BR': 'BRA', 'PT': 'PRT', 'SG': 'SGP', 'IT': 'ITA', 'CH': 'CHE',
-        'AT': 'AUT', 'PL': 'POL', 'DK': 'DNK', 'CZ': 'CZE', 'FI': 'FIN',
-        'BE': 'BEL', 'SE': 'SWE', 'MX': 'MEX', 'IE': 'IRL', 'RU': 'RUS',
-        'UA': 'UKR', 'HK': 'HKG', 'RO': 'ROU', 'IL': 'ISR', 'HU': 'HUN',
-        'LT': 'LTU', 'HR': 'HRV', 'EE': 'EST', 'LU': 'LUX', 'SK': 'SVK',
-        'SI': 'SVN', 'GR': 'GRC', 'BG': 'BGR', 'NO': 'NOR', 'CO': 'COL',
-        'NZ': 'NZL', 'TR': 'TUR', 'MY': 'MYS', 'TH': 'THA', 'VN': 'VNM',
-        'PK': 'PAK', 'PH': 'PHL', 'ID': 'IDN', 'AR': 'ARG', 'CL': 'CHL'
-    }
-    
-    # Add country names for better readability
-    country_names = {
-        'US': 'United States', 'GB': 'United Kingdom', 'CA': 'Canada', 'DE': 'Germany', 'ES': 'Spain',
-        'IN': 'India', 'FR': 'France', 'AU': 'Australia', 'NL': 'Netherlands', 'JP': 'Japan',
-        'BR': 'Brazil', 'PT': 'Portugal', 'SG': 'Singapore', 'IT': 'Italy', 'CH': 'Switzerland',
-        'AT': 'Austria', 'PL': 'Poland', 'DK': 'Denmark', 'CZ': 'Czech Republic', 'FI': 'Finland',
-        'BE': 'Belgium', 'SE': 'Sweden', 'MX': 'Mexico', 'IE': 'Ireland', 'RU': 'Russia',
-        'UA': 'Ukraine', 'HK': 'Hong Kong', 'RO': 'Romania', 'IL': 'Israel', 'HU': 'Hungary',
-        'LT': 'Lithuania', 'HR': 'Croatia', 'EE': 'Estonia', 'LU': 'Luxembourg', 'SK': 'Slovakia',
-        'SI': 'Slovenia', 'GR': 'Greece', 'BG': 'Bulgaria', 'NO': 'Norway', 'CO': 'Colombia',
-        'NZ': 'New Zealand', 'TR': 'Turkey', 'MY': 'Malaysia', 'TH': 'Thailand', 'VN': 'Vietnam',
-        'PK': 'Pakistan', 'PH': 'Philippines', 'ID': 'Indonesia', 'AR': 'Argentina', 'CL': 'Chile'
-    }
-    
-    # Add the ISO codes and country names to the dataframe
-    location_salary['ISO_Code'] = location_salary['Country Code'].map(country_code_map)
-    location_salary['Country Name'] = location_salary['Country Code'].map(country_names)
-    
-    # Fill missing values with the country code
-    location_salary['Country Name'] = location_salary['Country Name'].fillna(location_salary['Country Code'])
-    
-    # Format the hover text to show detailed statistics
-    location_salary['Hover Text'] = location_salary.apply(
-        lambda row: f"<b>{row['Country Name']} ({row['Country Code']})</b><br>" +
-                    f"Average Salary: ${row['Average Salary']:,.0f}<br>" +
-                    f"Median Salary: ${row['Median Salary']:,.0f}<br>" +
-                    f"Standard Deviation: ${row['Salary Std Dev']:,.0f}<br>" +
-                    f"Number of Jobs: {row['Count']}",
-        axis=1
-    )
+    def salary_map_chart():
+        fig = px.choropleth(
+            location_salary,
+            locations='ISO_Code',  # Use the 3-letter ISO codes
+            color='Average Salary',
+            hover_name='Country Name',  # Keep the original 2-letter code for hover
+            custom_data=['Hover Text'],
+            title="Average Salary by Country (USD)",
+            color_continuous_scale='Blues',
+            projection='natural earth'
+        )
     
-    fig = px.choropleth(
-        location_salary,
-        locations='ISO_Code',  # Use the 3-letter ISO codes
-        color='Average Salary',
-        hover_name='Country Name',  # Keep the original 2-letter code for hover
-        custom_data=['Hover Text'],
-        title="Average Salary by Country (USD)",
-        color_continuous_scale='Blues',
-        projection='natural earth'
-    )
+        # Update hover template to show the custom hover text
+        fig.update_traces(
+            hovertemplate="%{customdata[0]}<extra></extra>"
+        )
     
-    # Update hover template to show the custom hover text
-    fig.update_traces(
-        hovertemplate="%{customdata[0]}<extra></extra>"
-    )
+        # Add a color bar title
+        fig.update_coloraxes(colorbar_title_text='Average Salary (USD)', colorbar_title_font=dict(size=14))
+    
+        fig.update_layout(
+            height=600,
+            margin=dict(l=0, r=0, t=30, b=0),
+            geo=dict(
+                showframe=False,
+                showcoastlines=True,
+                projection_type='equirectangular',
+                landcolor='rgb(243, 243, 243)',
+                coastlinecolor='rgb(223, 223, 223)',
+                countrycolor='rgb(223, 223, 223)'
+            ),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            font=dict(family="Arial, sans-serif"),
+            hoverlabel=dict(font_size=12, font_family="Arial, sans-serif", bgcolor="white", bordercolor="#e5e7eb")
+        )
+        return fig
     
-    # Add a color bar title
-    fig.update_coloraxes(colorbar_title_text='Average Salary (USD)', colorbar_title_font=dict(size=14))
-    
-    fig.update_layout(
-        height=600,
-        margin=dict(l=0, r=0, t=30, b=0),
-        geo=dict(
-            showframe=False,
-            showcoastlines=True,
-            projection_type='equirectangular',
-            landcolor='rgb(243, 243, 243)',
-            coastlinecolor='rgb(223, 223, 223)',
-            countrycolor='rgb(223, 223, 223)'
-        ),
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Arial, sans-serif"),
-        hoverlabel=dict(font_size=12, font_family="Arial, sans-serif", bgcolor="white", bordercolor="#e5e7eb")
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('salary_map', salary_map_chart), use_container_width=True)
     
     # Top countries by average salary
     st.markdown('<h3 class="sub-header">Top Countries by Average Salary</h3>', unsafe_allow_html=True)
     
-    top_countries = location_salary.head(10)
+    def top_countries_chart():
+        top_countries = location_salary.head(10)
+    
+        fig = px.bar(
+            top_countries,
+            x='Country Code',
+            y='Average Salary',
+            title="Top 10 Countries by Average Salary",
+            color='Average Salary',
+            color_continuous_scale='Blues',
+            hover_data=['Count']
+        )
+        fig.update_layout(
+            xaxis_title="Country",
+            yaxis_title="Average Salary (USD)",
+            height=500
+        )
+        return fig
     
-    fig = px.bar(
-        top_countries,
-        x='Country Code',
-        y='Average Salary',
-        title="Top 10 Countries by Average Salary",
-        color='Average Salary',
-        color_continuous_scale='Blues',
-        hover_data=['Count']
-    )
-    fig.update_layout(
-        xaxis_title="Country",
-        yaxis_title="Average Salary (USD)",
-        height=500
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('top_countries', top_countries_chart), use_container_width=True)
     
     # Salary comparison: Employee residence vs. Company location
     st.markdown('<h3 class="sub-header">Salary Comparison: Employee Residence vs. Company Location</h3>', unsafe_allow_html=True)
     
-    # Get top 10 countries by count
-    top_countries_by_count = filtered_df['company_location'].value_counts().head(10).index.tolist()
-    
-    # Filter data for these countries
-    country_comparison = filtered_df[filtered_df['company_location'].isin(top_countries_by_count)]
-    
-    # Calculate average salary by employee residence and company location
-    emp_residence = country_comparison.groupby('employee_residence')['salary_in_usd'].mean().reset_index()
-    emp_residence.columns = ['Country', 'Average Salary']
-    emp_residence['Type'] = 'Employee Residence'
-    
-    comp_location = country_comparison.groupby('company_location')['salary_in_usd'].mean().reset_index()
-    comp_location.columns = ['Country', 'Average Salary']
-    comp_location['Type'] = 'Company Location'
-    
-    combined = pd.concat([emp_residence, comp_location])
+    def residence_vs_location_chart():
+        fig = px.bar(
+            combined,
+            x='Country',
+            y='Average Salary',
+            color='Type',
+            barmode='group',
+            title="Average Salary: Employee Residence vs. Company Location",
+            color_discrete_sequence=['#0083B8', '#00B0B9']
+        )
+        fig.update_layout(
+            xaxis_title="Country",
+            yaxis_title="Average Salary (USD)",
+            height=500,
+            legend_title="Type"
+        )
+        return fig
     
-    fig = px.bar(
-        combined,
-        x='Country',
-        y='Average Salary',
-        color='Type',
-        barmode='group',
-        title="Average Salary: Employee Residence vs. Company Location",
-        color_discrete_sequence=['#0083B8', '#00B0B9']
-    )
-    fig.update_layout(
-        xaxis_title="Country",
-        yaxis_title="Average Salary (USD)",
-        height=500,
-        legend_title="Type"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('residence_vs_location', residence_vs_location_chart), use_container_width=True)
 
 # Experience Impact Tab
-with tabs[4]:
+if active_tab == 'Experience Impact':
     st.markdown('<h2 class="sub-header">Experience Level Impact</h2>', unsafe_allow_html=True)
     
-    # Salary progression by experience level for top job titles
-    st.markdown('<h3 class="sub-header">Salary Progression by Experience Level</h3>', unsafe_allow_html=True)
-    
-    # Get top 5 job titles
-    top_5_jobs = filtered_df['job_title'].value_counts().head(5).index.tolist()
+    def prepare_experience_impact():
+        # Get top 5 job titles
+        top_5_jobs = filtered_cube.rollup('job_title').nlargest(5, 'count')['job_title'].tolist()
+        
+        # Filter data for these job titles
+        exp_progression = filtered_cube.restrict('job_title', top_5_jobs)
+        
+        # Group by job title and experience level
+        job_exp_salary = exp_progression.rollup('job_title', 'experience_level_full')[['job_title', 'experience_level_full', 'mean']]
+        job_exp_salary.columns = ['job_title', 'experience_level_full', 'salary_in_usd']
+        
+        # Create experience level order for proper sorting
+        exp_level_order = {'Entry Level': 0, 'Mid Level': 1, 'Senior Level': 2, 'Executive Level': 3}
+        job_exp_salary['exp_order'] = job_exp_salary['experience_level_full'].map(exp_level_order)
+        job_exp_salary = job_exp_salary.sort_values(['job_title', 'exp_order'])
+        
+        exp_dist = filtered_cube.rollup('experience_level_full')[['experience_level_full', 'count']]
+        exp_dist.columns = ['Experience Level', 'Count']
+        
+        # Sort by experience level in logical order
+        exp_dist['order'] = exp_dist['Experience Level'].map(exp_level_order)
+        exp_dist = exp_dist.sort_values('order').drop('order', axis=1)
+        
+        remote_exp = filtered_cube.rollup('experience_level_full', 'remote_work')[['experience_level_full', 'remote_work', 'count']]
+        remote_exp.columns = ['Experience Level', 'Remote Status', 'Count']
+        
+        # Sort by experience level in logical order
+        remote_exp['order'] = remote_exp['Experience Level'].map(exp_level_order)
+        remote_exp = remote_exp.sort_values('order')
+        return job_exp_salary, exp_dist, remote_exp
     
-    # Filter data for these job titles
-    exp_progression = filtered_df[filtered_df['job_title'].isin(top_5_jobs)]
+    job_exp_salary, exp_dist, remote_exp = tab_data('Experience Impact', prepare_experience_impact)
     
-    # Group by job title and experience level
-    job_exp_salary = exp_progression.groupby(['job_title', 'experience_level_full'])['salary_in_usd'].mean().reset_index()
+    # Salary progression by experience level for top job titles
+    st.markdown('<h3 class="sub-header">Salary Progression by Experience Level</h3>', unsafe_allow_html=True)
     
-    # Create experience level order for proper sorting
-    exp_level_order = {'Entry Level': 0, 'Mid Level': 1, 'Senior Level': 2, 'Executive Level': 3}
-    job_exp_salary['exp_order'] = job_exp_salary['experience_level_full'].map(exp_level_order)
-    job_exp_salary = job_exp_salary.sort_values(['job_title', 'exp_order'])
+    def experience_progression_chart():
+        fig = px.line(
+            job_exp_salary,
+            x='experience_level_full',
+            y='salary_in_usd',
+            color='job_title',
+            markers=True,
+            title="Salary Progression by Experience Level for Top 5 Job Titles",
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+        fig.update_layout(
+            xaxis_title="Experience Level",
+            yaxis_title="Average Salary (USD)",
+            height=600,
+            xaxis={'categoryorder':'array', 'categoryarray':['Entry Level', 'Mid Level', 'Senior Level', 'Executive Level']}
+        )
+        return fig
     
-    fig = px.line(
-        job_exp_salary,
-        x='experience_level_full',
-        y='salary_in_usd',
-        color='job_title',
-        markers=True,
-        title="Salary Progression by Experience Level for Top 5 Job Titles",
-        color_discrete_sequence=px.colors.qualitative.Bold
-    )
-    fig.update_layout(
-        xaxis_title="Experience Level",
-        yaxis_title="Average Salary (USD)",
-        height=600,
-        xaxis={'categoryorder':'array', 'categoryarray':['Entry Level', 'Mid Level', 'Senior Level', 'Executive Level']}
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('experience_progression', experience_progression_chart), use_container_width=True)
     
     # Experience level distribution
     st.markdown('<h3 class="sub-header">Experience Level Distribution</h3>', unsafe_allow_html=True)
     
-    exp_dist = filtered_df['experience_level_full'].value_counts().reset_index()
-    exp_dist.columns = ['Experience Level', 'Count']
-    
-    # Sort by experience level in logical order
-    exp_dist['order'] = exp_dist['Experience Level'].map(exp_level_order)
-    exp_dist = exp_dist.sort_values('order').drop('order', axis=1)
+    def experience_distribution_chart():
+        fig = px.pie(
+            exp_dist,
+            values='Count',
+            names='Experience Level',
+            title="Distribution of Experience Levels",
+            color_discrete_sequence=px.colors.sequential.Blues_r
+        )
+        fig.update_layout(
+            height=500
+        )
+        return fig
     
-    fig = px.pie(
-        exp_dist,
-        values='Count',
-        names='Experience Level',
-        title="Distribution of Experience Levels",
-        color_discrete_sequence=px.colors.sequential.Blues_r
-    )
-    fig.update_layout(
-        height=500
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('experience_distribution', experience_distribution_chart), use_container_width=True)
     
     # Experience level impact on remote work
     st.markdown('<h3 class="sub-header">Experience Level Impact on Remote Work</h3>', unsafe_allow_html=True)
     
-    remote_exp = filtered_df.groupby(['experience_level_full', 'remote_work']).size().reset_index()
-    remote_exp.columns = ['Experience Level', 'Remote Status', 'Count']
-    
-    # Sort by experience level in logical order
-    remote_exp['order'] = remote_exp['Experience Level'].map(exp_level_order)
-    remote_exp = remote_exp.sort_values('order')
+    def remote_by_experience_chart():
+        fig = px.bar(
+            remote_exp,
+            x='Experience Level',
+            y='Count',
+            color='Remote Status',
+            title="Remote Work Distribution by Experience Level",
+            color_discrete_sequence=['#0083B8', '#00B0B9', '#00D7B9']
+        )
+        fig.update_layout(
+            xaxis_title="Experience Level",
+            yaxis_title="Count",
+            height=500,
+            legend_title="Remote Status",
+            xaxis={'categoryorder':'array', 'categoryarray':['Entry Level', 'Mid Level', 'Senior Level', 'Executive Level']}
+        )
+        return fig
     
-    fig = px.bar(
-        remote_exp,
-        x='Experience Level',
-        y='Count',
-        color='Remote Status',
-        title="Remote Work Distribution by Experience Level",
-        color_discrete_sequence=['#0083B8', '#00B0B9', '#00D7B9']
-    )
-    fig.update_layout(
-        xaxis_title="Experience Level",
-        yaxis_title="Count",
-        height=500,
-        legend_title="Remote Status",
-        xaxis={'categoryorder':'array', 'categoryarray':['Entry Level', 'Mid Level', 'Senior Level', 'Executive Level']}
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(cached_figure('remote_by_experience', remote_by_experience_chart), use_container_width=True)
 
 # Salary Predictor Tab
-with tabs[5]:
+if active_tab == 'Salary Predictor':
     st.markdown('<h2 class="sub-header">🤖 AI-Powered Salary Predictor</h2>', unsafe_allow_html=True)
     
     # Introduction
@@ -1143,102 +1247,23 @@ with tabs[5]:
     </div>
     ''', unsafe_allow_html=True)
     
-    # Model training and prediction functions
-    @st.cache_data
-    def prepare_ml_data(df):
-        """Prepare data for machine learning"""
-        ml_df = df.copy()
-        
-        # Select relevant features
-        features = ['work_year', 'experience_level', 'employment_type', 'job_title', 
-                   'company_location', 'company_size', 'remote_ratio']
-        
-        # Create feature dataframe
-        X = ml_df[features].copy()
-        y = ml_df['salary_in_usd'].copy()
-        
-        # Encode categorical variables
-        label_encoders = {}
-        categorical_features = ['experience_level', 'employment_type', 'job_title', 'company_location', 'company_size']
-        
-        for feature in categorical_features:
-            le = LabelEncoder()
-            X[feature] = le.fit_transform(X[feature].astype(str))
-            label_encoders[feature] = le
-        
-        return X, y, label_encoders
-    
-    @st.cache_data
-    def train_models(X, y):
-        """Train multiple ML models"""
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Scale features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-        
-        # Initialize models
-        models = {
-            'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42),
-            'XGBoost': xgb.XGBRegressor(n_estimators=100, random_state=42),
-            'Gradient Boosting': GradientBoostingRegressor(n_estimators=100, random_state=42),
-            'Linear Regression': LinearRegression()
-        }
-        
-        # Train models and evaluate
-        model_results = {}
-        trained_models = {}
-        
-        for name, model in models.items():
-            if name == 'Linear Regression':
-                model.fit(X_train_scaled, y_train)
-                y_pred = model.predict(X_test_scaled)
-            else:
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_test)
-            
-            # Calculate metrics
-            mae = mean_absolute_error(y_test, y_pred)
-            mse = mean_squared_error(y_test, y_pred)
-            rmse = np.sqrt(mse)
-            r2 = r2_score(y_test, y_pred)
-            
-            model_results[name] = {
-                'MAE': mae,
-                'RMSE': rmse,
-                'R²': r2,
-                'model': model
-            }
-            trained_models[name] = model
-        
-        return model_results, trained_models, scaler, X_test, y_test
-    
-    def predict_salary(model, scaler, label_encoders, features, model_name):
-        """Make salary prediction"""
-        # Create feature vector
-        feature_vector = np.array([
-            features['work_year'],
-            label_encoders['experience_level'].transform([features['experience_level']])[0],
-            label_encoders['employment_type'].transform([features['employment_type']])[0],
-            label_encoders['job_title'].transform([features['job_title']])[0],
-            label_encoders['company_location'].transform([features['company_location']])[0],
-            label_encoders['company_size'].transform([features['company_size']])[0],
-            features['remote_ratio']
-        ]).reshape(1, -1)
-        
-        # Make prediction
-        if model_name == 'Linear Regression':
-            feature_vector = scaler.transform(feature_vector)
-        
-        prediction = model.predict(feature_vector)[0]
-        return max(0, prediction)  # Ensure non-negative prediction
-    
-    # Prepare data and train models
-    with st.spinner('Preparing machine learning models...'):
-        X, y, label_encoders = prepare_ml_data(df)
-        model_results, trained_models, scaler, X_test, y_test = train_models(X, y)
+    # Models are trained on the store's training snapshot; appended rows only
+    # reach them once someone asks for a retrain
+    if store.models_stale:
+        new_rows = data.n_rows - store.training_snapshot.n_rows
+        st.warning(f"{new_rows:,} rows have been appended since the models were trained.")
+        if st.button("🔄 Retrain models on the latest data"):
+            store.retrain()
+    training_data = store.training_snapshot
+    
+    # Load the trained models from the registry, training only for a new data/settings key
+    with st.spinner('Preparing machine learning models...'), profile.stage('load models'):
+        model_bundle = load_models(training_data.fingerprint, training_data.df)
+        model_results = model_bundle['model_results']
+        trained_models = model_bundle['trained_models']
+        scaler = model_bundle['scaler']
+        label_encoders = model_bundle['label_encoders']
+        X_test, y_test = model_bundle['X_test'], model_bundle['y_test']
     
     # Create two columns for layout
     col1, col2 = st.columns([1, 1])
@@ -1246,12 +1271,19 @@ with tabs[5]:
     with col1:
         st.markdown('<h3 class="sub-header">📝 Input Features</h3>', unsafe_allow_html=True)
         
+        lookup_mode = st.checkbox(
+            "⚡ Instant lookup mode",
+            value=False,
+            help="Precompute the selected model's predictions for every form combination "
+                 "in the latest survey year, so each submit is an array lookup"
+        )
+        
         # Input form
         with st.form("prediction_form"):
             # Work year
             work_year = st.selectbox(
                 "Work Year",
-                options=sorted(df['work_year'].unique(), reverse=True),
+                options=sorted(training_data.domain['years'], reverse=True),
                 index=0
             )
             
@@ -1272,13 +1304,13 @@ with tabs[5]:
             # Job title
             job_title = st.selectbox(
                 "Job Title",
-                options=sorted(df['job_title'].unique())
+                options=training_data.domain['job_titles']
             )
             
             # Company location
             company_location = st.selectbox(
                 "Company Location",
-                options=sorted(df['company_location'].unique())
+                options=training_data.domain['locations']
             )
             
             # Company size
@@ -1316,6 +1348,8 @@ with tabs[5]:
         performance_df['MAE'] = performance_df['MAE'].apply(lambda x: f"${x:,.0f}")
         performance_df['RMSE'] = performance_df['RMSE'].apply(lambda x: f"${x:,.0f}")
         performance_df['R²'] = performance_df['R²'].apply(lambda x: f"{x:.3f}")
+        performance_df['Fit Time (s)'] = performance_df['Fit Time (s)'].apply(lambda x: f"{x:.2f}")
+        performance_df['Predict Time (s)'] = performance_df['Predict Time (s)'].apply(lambda x: f"{x:.3f}")
         
         # Remove the model column for display
         display_df = performance_df.drop('model', axis=1)
@@ -1332,6 +1366,7 @@ with tabs[5]:
         - **MAE**: Mean Absolute Error (lower is better)
         - **RMSE**: Root Mean Square Error (lower is better)  
         - **R²**: Coefficient of Determination (higher is better, max 1.0)
+        - **Fit / Predict Time**: Wall-clock seconds to train and to score the test set
         """)
     
     # Prediction results
@@ -1352,7 +1387,22 @@ with tabs[5]:
         try:
             # Make prediction
             model = trained_models[selected_model]
-            predicted_salary = predict_salary(model, scaler, label_encoders, features, selected_model)
+            predicted_salary = None
+            if lookup_mode:
+                with st.spinner(f'Precomputing {selected_model} predictions...'), profile.stage('prediction table'):
+                    table = load_prediction_table(model_bundle['key'], selected_model, model_bundle, training_data.domain)
+                with profile.stage('predict (lookup)'):
+                    predicted_salary = table.lookup(features)
+                st.caption(
+                    f"Lookup table: {table.size:,} profiles, {table.nbytes / 2**20:.1f} MB, "
+                    f"built in {table.build_seconds:.1f}s"
+                    + ("" if predicted_salary is not None else " — profile outside the table, scored live")
+                )
+            if predicted_salary is None:
+                with profile.stage('predict_salary'):
+                    predicted_salary = predict_salary(
+                        scoring_model(model_bundle, selected_model), scaler, label_encoders, features, selected_model
+                    )
             
             # Display prediction with confidence interval
             col1, col2, col3 = st.columns(3)
@@ -1370,18 +1420,18 @@ with tabs[5]:
                 ''', unsafe_allow_html=True)
             
             with col2:
-                # Calculate confidence interval (±15% based on model uncertainty)
-                confidence_interval = predicted_salary * 0.15
-                lower_bound = predicted_salary - confidence_interval
-                upper_bound = predicted_salary + confidence_interval
+                # Split-conformal interval calibrated on the held-out test split,
+                # per experience level / location segment where there is enough data
+                model_intervals = model_bundle['intervals'][selected_model]
+                lower_bound, upper_bound, interval_segment, interval_rows = model_intervals.interval(predicted_salary, features)
                 
                 st.markdown(f'''
                 <div class="metric-container">
                     <div style="text-align: center;">
                         <div style="font-size: 2rem; margin-bottom: 10px; color: var(--secondary-color);">📊</div>
-                        <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">Confidence Range</p>
+                        <p style="font-size: 0.9rem; color: var(--text-muted); margin-bottom: 5px; display: block;">{model_intervals.coverage:.0%} Prediction Interval</p>
                         <p style="font-size: 1.2rem; font-weight: 600; color: var(--secondary-color); margin: 0; display: block;">${lower_bound:,.0f} - ${upper_bound:,.0f}</p>
-                        <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">±15% uncertainty</p>
+                        <p style="font-size: 0.8rem; color: var(--text-muted); margin-top: 5px; display: block;">Calibrated on {interval_rows:,} held-out profiles ({interval_segment})</p>
                     </div>
                 </div>
                 ''', unsafe_allow_html=True)
@@ -1403,50 +1453,97 @@ with tabs[5]:
                 ''', unsafe_allow_html=True)
             
             # Feature importance (for tree-based models)
-            if selected_model in ['Random Forest', 'XGBoost', 'Gradient Boosting']:
+            if selected_model in TREE_MODELS:
+                feature_names = ['Work Year', 'Experience Level', 'Employment Type', 'Job Title', 'Company Location', 'Company Size', 'Remote Ratio']
+                with profile.stage('load explainer'):
+                    explainer = load_explainer(model_bundle['key'], selected_model, model_bundle)
+                
+                # Per-prediction SHAP contributions (LRU-cached per profile)
+                st.markdown('<h3 class="sub-header">🧭 Why This Prediction</h3>', unsafe_allow_html=True)
+                with profile.stage('explain prediction'):
+                    contributions = explainer.explain(encode_profile(label_encoders, features))
+                contribution_df = pd.DataFrame({
+                    'Feature': [f"{name} = {features[feature]}" for name, feature in zip(feature_names, FEATURES)],
+                    'Contribution': contributions,
+                }).sort_values('Contribution', key=abs)
+                fig = px.bar(
+                    contribution_df,
+                    x='Contribution',
+                    y='Feature',
+                    orientation='h',
+                    title=f"SHAP Contributions vs. Average Prediction (${explainer.base_value:,.0f}) - {selected_model}",
+                    color='Contribution',
+                    color_continuous_scale='RdBu',
+                    color_continuous_midpoint=0
+                )
+                fig.update_layout(
+                    height=400,
+                    xaxis_title="Contribution to Predicted Salary (USD)",
+                    yaxis_title="Features"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
                 st.markdown('<h3 class="sub-header">🔍 Feature Importance</h3>', unsafe_allow_html=True)
                 
-                # Get feature importance
-                if hasattr(model, 'feature_importances_'):
-                    feature_names = ['Work Year', 'Experience Level', 'Employment Type', 'Job Title', 'Company Location', 'Company Size', 'Remote Ratio']
+                # Global mean |SHAP| over the test set, computed in the background;
+                # the model's own importances stand in until the first chunk lands
+                shap_summary = explainer.global_summary()
+                if shap_summary is not None:
+                    importance_df = pd.DataFrame({
+                        'Feature': feature_names,
+                        'Importance': shap_summary['mean_abs_shap']
+                    }).sort_values('Importance', ascending=True)
+                    importance_title = f"Mean |SHAP| - {selected_model}"
+                    if not explainer.background_done:
+                        st.caption(f"SHAP summary over {explainer.background_rows:,} of {explainer.background_total:,} test profiles so far")
+                else:
                     importance_df = pd.DataFrame({
                         'Feature': feature_names,
                         'Importance': model.feature_importances_
                     }).sort_values('Importance', ascending=True)
-                    
-                    # Create horizontal bar chart
-                    fig = px.bar(
-                        importance_df,
-                        x='Importance',
-                        y='Feature',
-                        orientation='h',
-                        title=f"Feature Importance - {selected_model}",
-                        color='Importance',
-                        color_continuous_scale='Blues'
-                    )
-                    fig.update_layout(
-                        height=400,
-                        xaxis_title="Importance Score",
-                        yaxis_title="Features"
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    importance_title = f"Feature Importance - {selected_model}"
+                    st.caption("SHAP summary is being computed in the background; showing the model's impurity importances")
+                
+                # Create horizontal bar chart
+                fig = px.bar(
+                    importance_df,
+                    x='Importance',
+                    y='Feature',
+                    orientation='h',
+                    title=importance_title,
+                    color='Importance',
+                    color_continuous_scale='Blues'
+                )
+                fig.update_layout(
+                    height=400,
+                    xaxis_title="Importance Score",
+                    yaxis_title="Features"
+                )
+                st.plotly_chart(fig, use_container_width=True)
             
             # Salary comparison with similar profiles
             st.markdown('<h3 class="sub-header">📈 Market Comparison</h3>', unsafe_allow_html=True)
             
-            # Find similar profiles
-            similar_profiles = df[
-                (df['experience_level'] == experience_level) &
-                (df['job_title'] == job_title) &
-                (df['company_location'] == company_location)
-            ]['salary_in_usd']
+            # Find similar profiles: an index lookup on (experience, title, location),
+            # falling back to coarser keys when the exact combination has no rows
+            with profile.stage('market lookup'):
+                market_match = data.market_index.lookup(features)
             
-            if len(similar_profiles) > 0:
+            if market_match is not None:
+                similar_profiles = market_match.salaries
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    avg_similar = similar_profiles.mean()
-                    percentile = (similar_profiles < predicted_salary).mean() * 100
+                    avg_similar = market_match.mean()
+                    percentile = market_match.percentile(predicted_salary)
+                    # Nearest comparable profiles on all features, even when few rows match exactly
+                    with profile.stage('comparable profiles'):
+                        comparables = data.comparable_index.comparables(features)
+                    comparable_p25, comparable_median, comparable_p75 = np.percentile(comparables, [25, 50, 75])
+                    matched_on = ' · '.join(
+                        {'experience_level': 'Experience', 'job_title': 'Title', 'company_location': 'Location'}[column]
+                        for column in market_match.level
+                    )
                     
                     st.markdown(f'''
                     <div class="insight-box">
@@ -1454,18 +1551,22 @@ with tabs[5]:
                         <p><strong>Average Salary:</strong> ${avg_similar:,.0f}</p>
                         <p><strong>Your Prediction Percentile:</strong> {percentile:.0f}%</p>
                         <p><strong>Sample Size:</strong> {len(similar_profiles)} profiles</p>
+                        <p><strong>Matched On:</strong> {matched_on}{'' if market_match.exact else ' (no exact matches)'}</p>
+                        <p><strong>{len(comparables)} Nearest Comparable Profiles:</strong> median ${comparable_median:,.0f} (${comparable_p25:,.0f} - ${comparable_p75:,.0f})</p>
                         <p style="font-size: 0.9rem; color: var(--text-muted); margin-top: 10px;">Your predicted salary is higher than {percentile:.0f}% of similar profiles.</p>
                     </div>
                     ''', unsafe_allow_html=True)
                 
                 with col2:
                     # Distribution plot
-                    fig = px.histogram(
-                        x=similar_profiles,
-                        nbins=20,
-                        title="Salary Distribution - Similar Profiles",
-                        labels={'x': 'Salary (USD)', 'y': 'Count'}
+                    # The matched salaries are already sorted, so bin counts are binary searches
+                    fig = binned_histogram(
+                        similar_profiles,
+                        20,
+                        presorted=True,
+                        title="Salary Distribution - Similar Profiles"
                     )
+                    fig.update_layout(xaxis_title='Salary (USD)', yaxis_title='Count')
                     
                     # Add prediction line
                     fig.add_vline(
@@ -1484,6 +1585,34 @@ with tabs[5]:
             st.error(f"Error making prediction: {str(e)}")
             st.info("This might happen if the selected combination of features is not present in the training data.")
     
+    # Batch scoring of many candidate profiles in one vectorized call
+    with st.expander("📂 Batch Prediction", expanded=False):
+        st.markdown(f"Upload a CSV with the columns `{', '.join(FEATURES)}` (raw codes, as in the dataset) to score every row at once.")
+        batch_file = st.file_uploader("Candidate profiles (CSV)", type="csv")
+        batch_model = st.selectbox("Batch Model", options=list(trained_models.keys()), key="batch_model")
+        
+        if batch_file is not None:
+            try:
+                profiles = pd.read_csv(batch_file)
+                with profile.stage('batch prediction'):
+                    batch_results = predict_salary_batch(
+                        scoring_model(model_bundle, batch_model, len(profiles)), scaler, label_encoders, profiles, batch_model
+                    )
+                scored = pd.concat([profiles, batch_results], axis=1)
+                if st.checkbox("Add nearest comparable salaries", value=False, key="batch_comparables"):
+                    scored = pd.concat([scored, data.comparable_index.summarise(profiles)], axis=1)
+                n_ok = int((batch_results['status'] == 'ok').sum())
+                st.success(f"Scored {n_ok:,} of {len(scored):,} profiles with {batch_model}")
+                st.dataframe(scored, use_container_width=True)
+                st.download_button(
+                    "⬇️ Download predictions",
+                    scored.to_csv(index=False).encode('utf-8'),
+                    file_name="salary_predictions.csv",
+                    mime="text/csv"
+                )
+            except ValueError as e:
+                st.error(f"Could not score the uploaded file: {str(e)}")
+    
     # Additional insights and tips
     st.markdown('<h3 class="sub-header">💡 Salary Optimization Tips</h3>', unsafe_allow_html=True)
     
@@ -1517,6 +1646,31 @@ with tabs[5]:
         </div>
         ''', unsafe_allow_html=True)
 
+# Whichever tab this session opened on is now on screen; the first run to get
+# here records the time to first render, measured from the session's first run
+run_timing = None
+if not st.session_state.get('startup_recorded'):
+    startup.mark('first render')
+    run_timing = startup.finish()
+    st.session_state['startup_recorded'] = True
+with st.sidebar.expander("⏱️ Startup Timing", expanded=False):
+    cold_start = startup_report.COLD_START_REPORT or run_timing
+    if cold_start is None:
+        st.caption("No startup timing recorded yet")
+    else:
+        st.caption(f"Cold start of this server process (target: first tab on screen within {cold_start['target']:.1f}s)")
+        st.dataframe(
+            pd.DataFrame({'Stage': list(cold_start['stages']), 'Seconds': list(cold_start['stages'].values())}).round(3),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.markdown(f"**Time to first paint:** {cold_start['time_to_first_paint']:.2f}s "
+                    f"({'within' if cold_start['within_target'] else 'over'} target)"
+                    + (f"  \n**This session:** {run_timing['time_to_first_paint']:.2f}s" if run_timing else ""))
+    deferred = startup_report.IMPORT_TIMES
+    if deferred:
+        st.caption("Loaded on first use: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in deferred.items()))
+
 # Enhanced professional footer with additional information
 st.markdown('''
 <div class="footer-container">
@@ -1546,3 +1700,31 @@ st.markdown('''
     </div>
 </div>
 ''', unsafe_allow_html=True)
+
+with st.sidebar.expander("🖼️ Figure Cache", expanded=False):
+    figure_stats = figures.stats()
+    st.markdown(f"**Hit rate:** {figure_stats['hit_rate']:.0%} "
+                f"({figure_stats['hits']:,} hits, {figure_stats['misses']:,} misses)  \n"
+                f"**Cached figures:** {figure_stats['entries']:,} "
+                f"({figure_stats['nbytes'] / 2**20:.1f} of {figure_stats['budget_bytes'] / 2**20:.0f} MB)")
+    if figure_stats['evictions']:
+        st.caption(f"{figure_stats['evictions']:,} figures evicted to stay within the budget")
+
+with st.sidebar.expander("🩺 Performance", expanded=False):
+    st.checkbox("Profile this session", key="profile_run",
+                help="Time each stage of every rerun and write the report to the profile log")
+    st.checkbox("Trace memory peaks", key="profile_memory", disabled=not st.session_state.get('profile_run', False),
+                help="Record each stage's peak allocation with tracemalloc (slows the app while on)")
+    run_profile = profile.finish()
+    if st.session_state.get('profile_run', False) and profile.stages:
+        stage_table = pd.DataFrame(run_profile['stages']).rename(
+            columns={'stage': 'Stage', 'seconds': 'Seconds', 'peak_bytes': 'Peak MB'}
+        )
+        stage_table['Seconds'] = stage_table['Seconds'].round(4)
+        if profile.trace_memory:
+            stage_table['Peak MB'] = (stage_table['Peak MB'] / 2**20).round(2)
+        else:
+            stage_table = stage_table.drop(columns='Peak MB')
+        st.caption(f"Last rerun: {run_profile['total_seconds']:.2f}s, "
+                   f"{run_profile['unstaged_seconds']:.2f}s outside the named stages (layout, widgets, rendering)")
+        st.dataframe(stage_table.sort_values('Seconds', ascending=False), use_container_width=True, hide_index=True)
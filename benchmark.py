@@ -0,0 +1,326 @@
+"""Synthetic salary data and a benchmark suite for the app's hot paths.
+
+``generate`` writes a CSV with the survey schema at any size, drawing job
+titles, company locations and employee residences from long-tailed
+distributions with cardinalities like the real survey's (about 130 titles and
+90 countries, most rows in a handful of them). ``run`` times, per dataset size:
+
+* loading the data (cold: CSV parse + sidecar write, warm: sidecar reload),
+* the sidebar filter block, with and without a narrowed salary range,
+* the cube and row-level aggregations the dashboard tabs are built from
+  (rollups, group medians, quartiles and box statistics, sketch and exact),
+* ``prepare_ml_data`` and ``train_models`` (on at most ``--max-train-rows``),
+* single and batch ``predict_salary`` per model,
+* building and probing the Market Comparison index,
+
+and writes the timings to JSON. ``compare`` diffs two result files and exits
+non-zero when a stage slowed down by more than the threshold.
+
+    python benchmark.py run --sizes 10k 1m 10m --out results.json
+    python benchmark.py compare baseline.json results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from chart_stats import box_stats, cube_box_stats
+from geo import COUNTRIES
+from ingest import COMPANY_SIZES, EMPLOYMENT_TYPES, EXPERIENCE_LEVELS, REMOTE_RATIOS
+from ml_pipeline import FEATURES, HYPERPARAMETERS, prepare_ml_data, predict_salary, predict_salary_batch, train_models
+from salary_cube import CUBE_DIMENSIONS, SalaryCube
+from salary_store import SalaryStore
+from tree_engine import compile_models, scoring_model
+
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+
+# Rows generated and written per chunk, bounding the generator's memory
+GENERATE_CHUNK_ROWS = 1_000_000
+
+# Stages slower than baseline by more than this fraction are reported as regressions
+REGRESSION_THRESHOLD = 0.2
+
+# Probes per repeated single-call measurement (single predictions, market lookups)
+PROBES = 200
+
+BATCH_ROWS = 1_000
+
+_TITLE_AREAS = ['Data', 'Machine Learning', 'AI', 'Analytics', 'BI', 'Research', 'Computer Vision',
+                'NLP', 'MLOps', 'Big Data', 'Cloud Data', 'Applied']
+_TITLE_ROLES = ['Engineer', 'Scientist', 'Analyst', 'Architect', 'Manager', 'Specialist', 'Developer',
+                'Lead', 'Consultant', 'Researcher', 'Director']
+JOB_TITLES = [f"{area} {role}" for area in _TITLE_AREAS for role in _TITLE_ROLES]
+
+# Countries the synthetic survey draws from, most common first
+LOCATIONS = ['US', 'GB', 'CA', 'DE', 'ES', 'IN', 'FR', 'AU', 'NL', 'PT'] + [
+    code for code in COUNTRIES.index if code not in {'US', 'GB', 'CA', 'DE', 'ES', 'IN', 'FR', 'AU', 'NL', 'PT'}
+][::3]
+
+# Share of rows whose employee lives in another country than the company
+CROSS_BORDER_SHARE = 0.05
+
+
+def _zipf_weights(n, exponent, head=None):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    if head is not None:
+        # Give the first value a fixed share, like the US in the survey
+        weights[1:] *= (1 - head) / weights[1:].sum()
+        weights[0] = head
+    return weights / weights.sum()
+
+
+def generate_chunk(n_rows, rng, years=(2020, 2025)):
+    """``n_rows`` synthetic survey rows with the CSV's columns"""
+    experience = rng.choice(list(EXPERIENCE_LEVELS), n_rows, p=[0.1, 0.25, 0.6, 0.05])
+    title_idx = rng.choice(len(JOB_TITLES), n_rows, p=_zipf_weights(len(JOB_TITLES), 1.1))
+    location_weights = _zipf_weights(len(LOCATIONS), 1.3, head=0.8)
+    location_idx = rng.choice(len(LOCATIONS), n_rows, p=location_weights)
+    residence_idx = np.where(
+        rng.random(n_rows) < CROSS_BORDER_SHARE,
+        rng.choice(len(LOCATIONS), n_rows, p=location_weights),
+        location_idx,
+    )
+
+    # Log-normal salaries shifted by experience, title and a per-country level
+    experience_shift = pd.Series([-0.5, -0.15, 0.15, 0.45], index=list(EXPERIENCE_LEVELS))[experience].to_numpy()
+    title_shift = np.random.default_rng(1).normal(0, 0.15, len(JOB_TITLES))[title_idx]
+    country_shift = -np.linspace(0, 1.2, len(LOCATIONS))[location_idx]
+    salary_in_usd = np.exp(rng.normal(11.9 + experience_shift + title_shift + country_shift, 0.35)).round()
+
+    return pd.DataFrame({
+        'work_year': rng.integers(years[0], years[1] + 1, n_rows),
+        'experience_level': experience,
+        'employment_type': rng.choice(list(EMPLOYMENT_TYPES), n_rows, p=[0.97, 0.01, 0.01, 0.01]),
+        'job_title': np.array(JOB_TITLES, dtype=object)[title_idx],
+        'salary': salary_in_usd.astype(np.int64),
+        'salary_currency': 'USD',
+        'salary_in_usd': salary_in_usd.astype(np.int64),
+        'employee_residence': np.array(LOCATIONS, dtype=object)[residence_idx],
+        'remote_ratio': rng.choice(list(REMOTE_RATIOS), n_rows, p=[0.6, 0.1, 0.3]),
+        'company_location': np.array(LOCATIONS, dtype=object)[location_idx],
+        'company_size': rng.choice(list(COMPANY_SIZES), n_rows, p=[0.05, 0.85, 0.1]),
+    })
+
+
+def generate(path, n_rows, seed=0):
+    """Write ``n_rows`` synthetic rows to the CSV at ``path``, chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    written = 0
+    while written < n_rows:
+        chunk = generate_chunk(min(GENERATE_CHUNK_ROWS, n_rows - written), rng)
+        chunk.to_csv(path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += len(chunk)
+    return path
+
+
+def _time(fn, repeat=1):
+    """Best wall time of ``repeat`` calls to ``fn`` and the last call's result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _per_call(fn, items, repeat):
+    """Best mean seconds per call of ``fn`` over ``items``"""
+    seconds, _ = _time(lambda: [fn(item) for item in items], repeat)
+    return seconds / len(items)
+
+
+def run_size(csv_path, repeat=3, max_train_rows=200_000, seed=0):
+    """Timings (seconds) of every benchmarked stage on one dataset"""
+    results = {}
+    work_dir = os.path.dirname(os.path.abspath(csv_path))
+    delta_dir = os.path.join(work_dir, 'salary_deltas')
+
+    results['load_cold'], store = _time(lambda: SalaryStore(csv_path, delta_dir=delta_dir))
+    results['load_warm'], store = _time(lambda: SalaryStore(csv_path, delta_dir=delta_dir), repeat)
+    data = store.snapshot
+    df, domain = data.df, data.domain
+
+    # A typical narrowed view: latest year, the two senior levels, the five most common locations
+    top_locations = df['company_location'].value_counts().index[:5].tolist()
+    selections = {
+        'years': [max(domain['years'])],
+        'experience': ['Senior Level', 'Executive Level'],
+        'job_titles': [],
+        'remote': domain['remote_labels'],
+        'company_size': domain['company_size_labels'],
+        'locations': top_locations,
+    }
+    full_range = (domain['min_salary'], domain['max_salary'])
+    narrowed = (domain['min_salary'] + (domain['max_salary'] - domain['min_salary']) // 10, domain['max_salary'])
+    # The sidebar filter block: a cube slice, or a cube over the filtered rows
+    # once the salary range is narrowed (salary is not a cube dimension)
+    results['filter'], (view, cube) = _time(
+        lambda: (data.filter_index.select(selections, full_range), data.cube.slice(selections)), repeat
+    )
+    results['filter_salary_range'], _ = _time(
+        lambda: SalaryCube(data.filter_index.select(selections, narrowed).frame(*CUBE_DIMENSIONS, 'salary_in_usd')).slice(),
+        repeat,
+    )
+
+    # The building blocks of every tab's chart data, from the sketches and from the rows
+    top_jobs = cube.rollup('job_title').nlargest(10, 'count')['job_title'].tolist()
+    results['cube_rollups'], _ = _time(
+        lambda: [cube.rollup(column) for column in ('job_title', 'experience_level_full', 'company_location')], repeat
+    )
+    results['group_medians'], _ = _time(
+        lambda: [cube.group_quantile(column, 0.5) for column in ('experience_level_full', 'company_location')], repeat
+    )
+    results['group_medians_exact'], _ = _time(
+        lambda: [view.frame(column, 'salary_in_usd').groupby(column, observed=True)['salary_in_usd'].median()
+                 for column in ('experience_level_full', 'company_location')],
+        repeat,
+    )
+    results['quartiles'], _ = _time(lambda: cube.quantiles([0.25, 0.5, 0.75]), repeat)
+    results['quartiles_exact'], _ = _time(lambda: view.column('salary_in_usd').quantile([0.25, 0.5, 0.75]), repeat)
+    results['job_boxes'], _ = _time(lambda: cube_box_stats(cube.restrict('job_title', top_jobs), 'job_title'), repeat)
+    job_frame = view.frame('job_title', 'salary_in_usd')
+    results['job_boxes_exact'], _ = _time(
+        lambda: box_stats(job_frame[job_frame['job_title'].isin(top_jobs)], 'job_title'), repeat
+    )
+
+    results['prepare_ml_data'], (X, y, label_encoders) = _time(lambda: prepare_ml_data(df), repeat)
+
+    # Training cost grows super-linearly; larger datasets train on a fixed-size sample
+    train_rows = min(len(X), max_train_rows)
+    sample = np.random.default_rng(seed).choice(len(X), train_rows, replace=False) if train_rows < len(X) else slice(None)
+    results['train_models'], (_, trained_models, scaler, _, _) = _time(
+        lambda: train_models(X.iloc[sample], y.iloc[sample])
+    )
+    bundle = {'trained_models': trained_models, 'compiled_models': compile_models(trained_models)}
+
+    rng = np.random.default_rng(seed)
+    profiles = df[FEATURES].iloc[rng.integers(0, len(df), max(PROBES, BATCH_ROWS))].reset_index(drop=True)
+    single = profiles.iloc[:PROBES].to_dict('records')
+    batch = profiles.iloc[:BATCH_ROWS]
+    for name in HYPERPARAMETERS:
+        key = name.lower().replace(' ', '_')
+        model = scoring_model(bundle, name)
+        results[f'predict_single_{key}'] = _per_call(
+            lambda features: predict_salary(model, scaler, label_encoders, features, name), single, repeat
+        )
+        batch_model = scoring_model(bundle, name, len(batch))
+        results[f'predict_batch_{key}'], _ = _time(
+            lambda: predict_salary_batch(batch_model, scaler, label_encoders, batch, name), repeat
+        )
+
+    results['market_index_build'], market_index = _time(lambda: data.market_index)
+    results['market_lookup'] = _per_call(market_index.lookup, single, repeat)
+
+    return {'rows': len(df), 'train_rows': train_rows, 'seconds': results}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Rows of (size, stage, baseline s, current s, ratio, regressed) for stages in both runs"""
+    rows = []
+    for size, run in current['sizes'].items():
+        base_run = baseline['sizes'].get(size)
+        if base_run is None:
+            continue
+        for stage, seconds in run['seconds'].items():
+            base = base_run['seconds'].get(stage)
+            if base is None or base <= 0:
+                continue
+            ratio = seconds / base
+            rows.append((size, stage, base, seconds, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _parse_size(text):
+    if text.lower() in SIZES:
+        return text.lower(), SIZES[text.lower()]
+    return text, int(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the salary app's hot paths on synthetic data")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('generate', help="write a synthetic salaries CSV")
+    gen.add_argument('--rows', default='10k', help="row count or one of: " + ', '.join(SIZES))
+    gen.add_argument('--out', default='synthetic_salaries.csv')
+    gen.add_argument('--seed', type=int, default=0)
+
+    run = commands.add_parser('run', help="time every stage at each size and write JSON")
+    run.add_argument('--sizes', nargs='+', default=['10k', '1m'])
+    run.add_argument('--out', default='benchmark_results.json')
+    run.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--max-train-rows', type=int, default=200_000)
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--work-dir', default=None, help="where generated CSVs and sidecars go (default: a temp dir)")
+
+    cmp = commands.add_parser('compare', help="flag stages that got slower between two result files")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args()
+    # Same as the app: scikit-learn's feature-name warnings would drown the report
+    warnings.filterwarnings('ignore')
+
+    if args.command == 'generate':
+        _, n_rows = _parse_size(args.rows)
+        generate(args.out, n_rows, args.seed)
+        print(f"Wrote {n_rows:,} rows to {args.out}")
+        return
+
+    if args.command == 'run':
+        report = {'environment': environment(), 'sizes': {}}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for size in args.sizes:
+                label, n_rows = _parse_size(size)
+                size_dir = os.path.join(args.work_dir or temp_dir, label)
+                os.makedirs(size_dir, exist_ok=True)
+                csv_path = os.path.join(size_dir, 'salaries.csv')
+                if not os.path.exists(csv_path):
+                    generate(csv_path, n_rows, args.seed)
+                print(f"== {label} ({n_rows:,} rows)", flush=True)
+                result = run_size(csv_path, args.repeat, args.max_train_rows, args.seed)
+                report['sizes'][label] = result
+                for stage, seconds in result['seconds'].items():
+                    print(f"  {stage:<36}{seconds * 1000:>12.3f} ms")
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.out}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'size':<6}{'stage':<36}{'baseline ms':>13}{'current ms':>13}{'change':>9}")
+    for size, stage, base, seconds, ratio, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{size:<6}{stage:<36}{base * 1000:>13.3f}{seconds * 1000:>13.3f}{(ratio - 1) * 100:>+8.0f}%{flag}")
+    regressions = sum(row[-1] for row in rows)
+    if regressions:
+        print(f"{regressions} stage(s) slower by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
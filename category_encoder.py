@@ -0,0 +1,72 @@
+"""Precompiled categorical encoders shared by training and inference.
+
+A ``CategoryEncoder`` assigns each training category the same code a sklearn
+``LabelEncoder`` would (its position in the sorted ``classes_``), but encodes
+through a hash index instead of validating and binary-searching on every call.
+Values never seen in training get the reserved ``UNKNOWN_CODE`` rather than
+raising, so callers decide per row what to do with them. Encoders are plain
+picklable objects and are saved inside the model bundle.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Code assigned to values outside the training categories
+UNKNOWN_CODE = -1
+
+
+class CategoryEncoder:
+    """Category -> integer code mapping with an unknown-value bucket"""
+
+    def __init__(self, classes=()):
+        self.classes_ = np.asarray(sorted(str(c) for c in classes), dtype=object)
+        self._build()
+
+    def _build(self):
+        self._index = pd.Index(self.classes_)
+        self._codes = {label: code for code, label in enumerate(self.classes_)}
+
+    @classmethod
+    def fit(cls, values):
+        """Encoder over the distinct values of ``values``"""
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Only categories that actually occur, as LabelEncoder would see them
+            distinct = values.cat.remove_unused_categories().cat.categories
+        else:
+            distinct = values.dropna().unique()
+        return cls(distinct)
+
+    def __len__(self):
+        return len(self.classes_)
+
+    def __getstate__(self):
+        # The lookup structures are rebuilt on load rather than pickled
+        return {'classes_': self.classes_}
+
+    def __setstate__(self, state):
+        self.classes_ = state['classes_']
+        self._build()
+
+    def encode(self, value):
+        """Code of a single value, or ``UNKNOWN_CODE``"""
+        return self._codes.get(str(value), UNKNOWN_CODE)
+
+    def transform(self, values):
+        """Vectorized codes for a column of values (int32, ``UNKNOWN_CODE`` where unseen)"""
+        if isinstance(values, (list, tuple)):
+            # Plain sequences (a single form submit) skip the Series round trip
+            return np.array([self.encode(value) for value in values], dtype=np.int32)
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Encode each distinct category once, then broadcast through the
+            # column's own codes; missing values (code -1) land on the trailing UNKNOWN_CODE
+            category_codes = self._index.get_indexer(values.cat.categories.astype(str))
+            return np.append(category_codes, UNKNOWN_CODE).astype(np.int32)[values.cat.codes.to_numpy()]
+        return self._index.get_indexer(values.astype(str)).astype(np.int32)
+
+    def inverse_transform(self, codes):
+        """Category labels for ``codes``; ``UNKNOWN_CODE`` maps to None"""
+        codes = np.asarray(codes)
+        labels = np.append(self.classes_, None)
+        return labels[np.where(codes == UNKNOWN_CODE, len(self.classes_), codes)]
@@ -0,0 +1,113 @@
+"""Pre-binned histograms and pre-summarised box plots.
+
+``px.histogram`` and ``px.box`` embed every salary row in the figure and leave
+binning and quartiles to the browser, so the websocket payload and client
+rendering grow with the filtered row count. The builders here compute bin
+counts and box statistics on the server with NumPy (or from the salary cube's
+quantile sketches) and draw them as bar and precomputed-box traces, whose size
+depends only on the number of bins or groups.
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Tukey whiskers: the most extreme values within this many IQRs of the box
+WHISKER_IQR = 1.5
+
+
+def histogram_bins(values, nbins, presorted=False):
+    """Equal-width bin edges and counts for ``values``.
+
+    Sorted input (``presorted=True``) is counted with a binary search per edge
+    instead of a pass over the values.
+    """
+    values = np.asarray(values, dtype='float64')
+    if len(values) == 0:
+        return np.zeros(nbins + 1), np.zeros(nbins, dtype=np.int64)
+    low, high = (values[0], values[-1]) if presorted else (values.min(), values.max())
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    edges = np.linspace(low, high, nbins + 1)
+    if presorted:
+        # Right-closed last bin, like np.histogram
+        positions = np.searchsorted(values, edges, side='left')
+        positions[-1] = len(values)
+        counts = np.diff(positions)
+    else:
+        counts, _ = np.histogram(values, bins=edges)
+    return edges, counts
+
+
+def binned_histogram(values, nbins, presorted=False, color=None, opacity=None, title=None, weight=1):
+    """Bar-trace histogram of ``values`` over ``nbins`` server-side bins.
+
+    Each value counts ``weight`` times, e.g. ``1 / rate`` for a row sample.
+    """
+    edges, counts = histogram_bins(values, nbins, presorted)
+    if weight != 1:
+        counts = np.rint(counts * weight).astype(np.int64)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate='$%{customdata[0]:,.0f} - $%{customdata[1]:,.0f}<br>Count: %{y:,}<extra></extra>',
+        marker_color=color,
+        opacity=opacity,
+    ))
+    fig.update_layout(title=title, bargap=0)
+    return fig
+
+
+def _with_whiskers(stats, low, high):
+    iqr = stats['q3'] - stats['q1']
+    stats['lowerfence'] = np.maximum(stats['q1'] - WHISKER_IQR * iqr, low)
+    stats['upperfence'] = np.minimum(stats['q3'] + WHISKER_IQR * iqr, high)
+    return stats
+
+
+def box_stats(frame, by, value='salary_in_usd'):
+    """Exact quartiles and Tukey whiskers of ``value`` per ``by`` group"""
+    grouped = frame.groupby(by, observed=True)[value]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    stats['count'] = grouped.size()
+    stats['mean'] = grouped.mean()
+    stats = stats.reset_index()
+
+    # Whiskers end at the most extreme values still inside the fences
+    fences = frame[[by, value]].merge(stats[[by, 'q1', 'q3']], on=by)
+    iqr = fences['q3'] - fences['q1']
+    inside = fences[value].between(fences['q1'] - WHISKER_IQR * iqr, fences['q3'] + WHISKER_IQR * iqr)
+    whiskers = fences[inside].groupby(by, observed=True)[value].agg(['min', 'max'])
+    stats = stats.merge(whiskers, left_on=by, right_index=True, how='left')
+    return _with_whiskers(stats, stats['min'], stats['max']).drop(columns=['min', 'max'])
+
+
+def cube_box_stats(cube_slice, by):
+    """Box statistics per ``by`` group from salary cube cells and their sketches.
+
+    Quartiles are quantile-sketch estimates, like the tabs' other medians;
+    whiskers are the Tukey fences clipped to each group's salary range.
+    """
+    stats = cube_slice.group_quantiles(by, [0.25, 0.5, 0.75], ['q1', 'median', 'q3'])
+    extremes = cube_slice.rollup(by)[[by, 'count', 'mean', 'min', 'max']]
+    stats = stats.merge(extremes, on=by)
+    return _with_whiskers(stats, stats['min'], stats['max']).drop(columns=['min', 'max'])
+
+
+def summary_box(stats, by, order=None, colors=px.colors.qualitative.Bold, title=None):
+    """One precomputed box trace per group of a ``box_stats`` frame"""
+    if order is not None:
+        stats = stats.set_index(by).loc[[group for group in order if group in set(stats[by])]].reset_index()
+    fig = go.Figure()
+    for i, row in enumerate(stats.to_dict('records')):
+        fig.add_trace(go.Box(
+            name=str(row[by]),
+            x=[row[by]],
+            **{stat: [row[stat]] for stat in ('q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean')},
+            marker_color=colors[i % len(colors)],
+        ))
+    fig.update_layout(title=title)
+    return fig
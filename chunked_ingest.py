@@ -0,0 +1,178 @@
+"""Out-of-core salary ingest for datasets larger than the memory budget.
+
+``load_salaries`` holds the whole cleaned frame in memory. When a memory budget
+is set (``SALARY_MEMORY_BUDGET_MB`` or ``SalaryStore(memory_budget=...)``) and
+the cleaned data would not fit in it, ``load_chunked`` streams the CSV (or its
+memory-mapped column store) in fixed-size chunks instead and folds each chunk
+into:
+
+- the domain metadata and the salary cube, which stay exact over every row;
+- a uniform row sample and its filter index, extended chunk by chunk, which
+  back the row-level views (exact percentiles, histograms, the market and
+  comparable-profile indexes) and model training.
+
+The sample keeps each row with probability ``rate``. Whenever it outgrows its
+share of the budget, every kept row survives a coin flip and ``rate`` halves, so
+all rows remain equally likely to be in it and counts over the sample scale
+back up by ``1 / rate``. Only one chunk, the cube and the sample are held at a
+time. The cube grows with the number of distinct dimension combinations rather
+than with rows; as it does, the sample gives up its room, down to
+``MIN_SAMPLE_ROWS``.
+"""
+
+import io
+import logging
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from column_store import open_column_store
+from filter_index import SalaryFilterIndex
+from ingest import (
+    CSV_DTYPES, _sidecar_paths, append_salaries, build_domain, clean_salaries,
+    file_fingerprint, merge_domain,
+)
+from salary_cube import SalaryCube
+
+MEMORY_BUDGET_ENV_VAR = 'SALARY_MEMORY_BUDGET_MB'
+
+# Share of the budget for one chunk in flight and at most for the resident row
+# sample; the cube comes out of what is left after the chunk
+CHUNK_SHARE = 0.25
+SAMPLE_SHARE = 0.5
+
+# Bytes held per cleaned row, as a multiple of the frame's own footprint: a chunk
+# is parsed, cleaned and grouped into a cube cell table; a sample row also costs
+# its filter index entries and a transient copy while chunks are appended
+CHUNK_OVERHEAD = 3.0
+SAMPLE_OVERHEAD = 2.0
+# Merging a chunk's cells into the cube briefly needs a few times the cube's size
+CUBE_OVERHEAD = 3.0
+
+# Rows parsed up front to estimate row size and count
+PROBE_ROWS = 10_000
+MIN_CHUNK_ROWS = 10_000
+# Floor under the sample, so the row-level views and model training keep some data
+MIN_SAMPLE_ROWS = 10_000
+
+# Fixed seed so the same file always yields the same sample (and model training set)
+SAMPLE_SEED = 0
+
+logger = logging.getLogger(__name__)
+
+
+def memory_budget_from_env():
+    """Memory budget in bytes from ``SALARY_MEMORY_BUDGET_MB``, or None when unset"""
+    value = os.environ.get(MEMORY_BUDGET_ENV_VAR, '')
+    return int(float(value) * (1 << 20)) if value else None
+
+
+def probe(path, rows=PROBE_ROWS):
+    """Estimated (cleaned bytes per row, row count) of the CSV at ``path``"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        lines = [line for _, line in zip(range(rows), f)]
+    if not lines:
+        return 0.0, 0
+    sample = clean_salaries(pd.read_csv(io.BytesIO(header + b''.join(lines)), dtype=CSV_DTYPES))
+    bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+    body_bytes = os.path.getsize(path) - len(header)
+    n_rows = int(body_bytes * len(lines) / sum(map(len, lines)))
+    return float(bytes_per_row), n_rows
+
+
+def needs_chunking(path, memory_budget):
+    """True when the cleaned CSV at ``path`` would not fit in its share of ``memory_budget``"""
+    bytes_per_row, n_rows = probe(path)
+    return bytes_per_row * SAMPLE_OVERHEAD * n_rows > memory_budget * SAMPLE_SHARE
+
+
+class RowSample:
+    """Uniform Bernoulli sample of streamed rows, capped at ``max_rows``"""
+
+    def __init__(self, max_rows, rng):
+        self.max_rows = max(int(max_rows), 1)
+        self.rng = rng
+        self.rate = 1.0
+        self.df = None
+        self.filter_index = None
+
+    def add(self, chunk, max_rows=None):
+        """Fold a cleaned chunk into the sample, thinning it when it outgrows the cap"""
+        if max_rows is not None:
+            self.max_rows = max(int(max_rows), 1)
+        if self.rate < 1.0:
+            chunk = chunk[self.rng.random(len(chunk)) < self.rate]
+        if self.df is None:
+            start, self.df = 0, chunk.reset_index(drop=True)
+        else:
+            start, self.df = len(self.df), append_salaries(self.df, chunk)
+
+        thinned = False
+        while len(self.df) > self.max_rows:
+            self.df = self.df[self.rng.random(len(self.df)) < 0.5].reset_index(drop=True)
+            self.rate /= 2
+            thinned = True
+        # Thinning renumbers rows, so only then is the index rebuilt from scratch
+        if thinned or self.filter_index is None:
+            self.filter_index = SalaryFilterIndex(self.df)
+        else:
+            self.filter_index = self.filter_index.extended(self.df, start)
+
+
+@dataclass
+class ChunkedLoad:
+    """Everything ``load_chunked`` builds from one pass over the data"""
+    sample: pd.DataFrame
+    filter_index: SalaryFilterIndex
+    cube: SalaryCube
+    domain: dict
+    sample_rate: float
+    chunk_rows: int
+
+
+def iter_salary_chunks(path, chunk_rows, fingerprint=None):
+    """Cleaned salary rows in chunks of at most ``chunk_rows``.
+
+    Slices the column store when one matches the CSV content (only the pages of
+    the current chunk are read in), otherwise parses the CSV chunk by chunk.
+    """
+    data_path, _ = _sidecar_paths(path, fingerprint or file_fingerprint(path))
+    if os.path.isdir(data_path):
+        store = open_column_store(data_path)
+        for start in range(0, len(store), chunk_rows):
+            yield store.iloc[start:start + chunk_rows].reset_index(drop=True)
+        return
+    for chunk in pd.read_csv(path, dtype=CSV_DTYPES, chunksize=chunk_rows):
+        yield clean_salaries(chunk)
+
+
+def load_chunked(path, memory_budget, fingerprint=None, seed=SAMPLE_SEED):
+    """Build the domain, cube, row sample and filter index in one bounded-memory pass"""
+    bytes_per_row, _ = probe(path)
+    bytes_per_row = max(bytes_per_row, 1.0)
+    row_bytes = bytes_per_row * SAMPLE_OVERHEAD
+    chunk_rows = max(int(memory_budget * CHUNK_SHARE / (bytes_per_row * CHUNK_OVERHEAD)), MIN_CHUNK_ROWS)
+    sample = RowSample(memory_budget * SAMPLE_SHARE / row_bytes, np.random.default_rng(seed))
+
+    domain = cube = None
+    for chunk in iter_salary_chunks(path, chunk_rows, fingerprint):
+        if len(chunk) == 0:
+            continue
+        domain = build_domain(chunk) if domain is None else merge_domain(domain, chunk)
+        cube = SalaryCube(chunk) if cube is None else cube.merged(SalaryCube(chunk))
+        # Whatever the cube leaves of the post-chunk budget caps the sample
+        room = memory_budget * (1 - CHUNK_SHARE) - cube.nbytes() * CUBE_OVERHEAD
+        sample.add(chunk, min(max(room / row_bytes, MIN_SAMPLE_ROWS), memory_budget * SAMPLE_SHARE / row_bytes))
+
+    if domain is None:
+        raise ValueError(f"{os.path.basename(path)} holds no valid salary rows")
+    if cube.nbytes() * CUBE_OVERHEAD > memory_budget * (1 - CHUNK_SHARE):
+        logger.warning(
+            "salary cube of %d cells (%.0f MB) leaves no room in the %.0f MB memory budget; "
+            "keeping the minimum %d-row sample", len(cube), cube.nbytes() / 2**20,
+            memory_budget / 2**20, MIN_SAMPLE_ROWS,
+        )
+    return ChunkedLoad(sample.df, sample.filter_index, cube, domain, sample.rate, chunk_rows)
@@ -0,0 +1,77 @@
+"""Memory-mapped column store for the cleaned salary frame.
+
+Every column is written as its own ``.npy`` file: numeric columns as they are
+(``salary_in_usd`` is int32), categorical columns as their integer codes, with
+the category dictionaries (values and ordering) alongside in
+``categories.json``. Readers open the files with ``np.load(mmap_mode='r')`` and
+wrap them in a DataFrame without copying, so every server process on a host
+maps the same physical pages from the OS page cache and per-process memory no
+longer grows with the row count.
+
+The arrays are read-only: anything that needs to modify a column works on a
+copy, which pandas' copy-on-write (the default from pandas 3.0, hence the
+requirement) makes automatically. A stray in-place write fails loudly on the
+read-only mapping rather than corrupting the shared files.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+STORE_SUFFIX = '.columns'
+DICTIONARY_FILE = 'categories.json'
+
+
+def _column_path(directory, column):
+    return os.path.join(directory, f"{column}.npy")
+
+
+def write_column_store(df, directory):
+    """Write ``df`` as one ``.npy`` file per column plus the category dictionaries"""
+    # Build under a temp name and rename into place, so readers never see a partial
+    # store; if another process got there first its (identical) store is kept
+    tmp_dir = f"{directory}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        layout = {'n_rows': int(len(df)), 'columns': list(df.columns), 'categories': {}}
+        for column in df.columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                np.save(_column_path(tmp_dir, column), values.array.codes)
+                layout['categories'][column] = {
+                    'values': values.cat.categories.tolist(),
+                    'ordered': bool(values.dtype.ordered),
+                }
+            else:
+                np.save(_column_path(tmp_dir, column), values.to_numpy())
+        with open(os.path.join(tmp_dir, DICTIONARY_FILE), 'w') as f:
+            json.dump(layout, f)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def open_column_store(directory):
+    """DataFrame over the store's memory-mapped, read-only column files"""
+    with open(os.path.join(directory, DICTIONARY_FILE)) as f:
+        layout = json.load(f)
+    columns = {}
+    for column in layout['columns']:
+        values = np.load(_column_path(directory, column), mmap_mode='r')
+        if len(values) != layout['n_rows']:
+            raise ValueError(f"column store {directory} has a truncated {column} column")
+        spec = layout['categories'].get(column)
+        if spec is not None:
+            # from_codes keeps the mapped codes array rather than copying it
+            values = pd.Categorical.from_codes(values, categories=spec['values'],
+                                               ordered=spec['ordered'], validate=False)
+        columns[column] = values
+    return pd.DataFrame(columns, copy=False)
+
@@ -0,0 +1,129 @@
+"""Cached TreeSHAP explanations for the tree-based salary models.
+
+One ``ModelExplainer`` per model artifact wraps a ``shap.TreeExplainer``. Single
+profile explanations are memoised in an LRU cache keyed by the encoded feature
+row, so repeated form submits cost a dictionary lookup. SHAP values for the whole
+held-out test set are computed in the background, in a forkserver worker, one
+chunk at a time (so shutdown only waits for the chunk in flight), and feed a
+global mean-|SHAP| summary that is usable (over the rows done so far) before the
+pass finishes.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+from ml_pipeline import FEATURES, process_context
+
+shap = lazy_import('shap')
+
+# Models TreeExplainer can explain exactly
+TREE_MODELS = ('Random Forest', 'XGBoost', 'Gradient Boosting')
+
+# Per-profile explanations kept per model
+EXPLANATION_CACHE_SIZE = 512
+
+# Test rows per background SHAP task
+BACKGROUND_CHUNK_ROWS = 10
+
+_worker_explainer = None
+
+
+def _init_worker(model):
+    global _worker_explainer
+    _worker_explainer = shap.TreeExplainer(model)
+
+
+def _explain_rows(rows):
+    return _worker_explainer.shap_values(rows)
+
+
+class ModelExplainer:
+    """TreeSHAP for one fitted model, with an LRU profile cache and a background global pass"""
+
+    def __init__(self, model, X_test, cache_size=EXPLANATION_CACHE_SIZE, background=True):
+        self.model = model
+        self.explainer = shap.TreeExplainer(model)
+        self.base_value = float(np.ravel(self.explainer.expected_value)[0])
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        # TreeExplainer holds the GIL and is not documented as thread-safe
+        self._lock = threading.Lock()
+
+        self._X_test = np.asarray(X_test, dtype='float64')
+        self.test_values = np.zeros_like(self._X_test)
+        self.background_rows = 0
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run_background, name='shap-background', daemon=True)
+            self._thread.start()
+
+    def explain(self, row):
+        """SHAP contributions (one per feature) for an encoded feature row"""
+        key = tuple(float(v) for v in np.ravel(row))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            values = np.ravel(self.explainer.shap_values(np.array([key])))
+            self._cache[key] = values
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return values
+
+    @property
+    def background_total(self):
+        return len(self._X_test)
+
+    @property
+    def background_done(self):
+        return self.background_rows >= self.background_total
+
+    def _store(self, start, values):
+        self.test_values[start:start + len(values)] = values
+        self.background_rows = start + len(values)
+
+    def _run_background(self):
+        pool = None
+        try:
+            # A worker process keeps the GIL-bound SHAP pass off the app's threads.
+            # Chunks go out one at a time: interpreter exit joins the pool, so it then
+            # waits for the chunk in flight rather than the rest of the pass
+            pool = ProcessPoolExecutor(max_workers=1, mp_context=process_context(),
+                                       initializer=_init_worker, initargs=(self.model,))
+            for start in range(0, len(self._X_test), BACKGROUND_CHUNK_ROWS):
+                future = pool.submit(_explain_rows, self._X_test[start:start + BACKGROUND_CHUNK_ROWS])
+                self._store(start, future.result())
+            return
+        except (BrokenProcessPool, OSError, PermissionError):
+            # Sandboxed hosts may forbid subprocesses; finish in this thread
+            pass
+        except RuntimeError:
+            # The interpreter is shutting down and takes no new work
+            return
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        for start in range(self.background_rows, len(self._X_test), BACKGROUND_CHUNK_ROWS):
+            with self._lock:
+                values = self.explainer.shap_values(self._X_test[start:start + BACKGROUND_CHUNK_ROWS])
+            self._store(start, values)
+
+    def global_summary(self):
+        """Mean |SHAP| per feature over the test rows explained so far, or None before the first chunk"""
+        done = self.background_rows
+        if done == 0:
+            return None
+        return pd.DataFrame({
+            'feature': FEATURES,
+            'mean_abs_shap': np.abs(self.test_values[:done]).mean(axis=0),
+        })
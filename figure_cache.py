@@ -0,0 +1,94 @@
+"""Process-wide cache of serialized Plotly figures.
+
+Dashboard charts are a pure function of the sidebar filter state, so each one is
+stored as its figure JSON under ``(state_key(filter_state), chart)``. The cache
+is shared by every session of the server process: a popular filter combination
+is built once and then served by rehydrating the JSON, which skips the
+``plotly.express`` pipeline (data validation, trace construction, templating).
+Entries are evicted least-recently-used once their total size exceeds the byte
+budget.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+# Serialized figures kept per process (bytes of JSON)
+DEFAULT_BUDGET_BYTES = 64 << 20
+
+
+def state_key(state):
+    """Stable hash of a filter state built from tuples, strings, numbers and booleans"""
+    canonical = json.dumps(state, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """LRU map of (filter state hash, chart name) -> figure JSON, bounded by total bytes"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # Sessions run on separate script threads
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, chart):
+        """Cached figure JSON, or None"""
+        with self._lock:
+            spec = self._entries.get((key, chart))
+            if spec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, chart))
+            self.hits += 1
+            return spec
+
+    def put(self, key, chart, spec):
+        with self._lock:
+            previous = self._entries.pop((key, chart), None)
+            if previous is not None:
+                self.nbytes -= len(previous)
+            if len(spec) > self.budget_bytes:
+                # Would evict everything else and still not fit
+                return
+            self._entries[(key, chart)] = spec
+            self.nbytes += len(spec)
+            while self.nbytes > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+
+    def figure(self, key, chart, build):
+        """The chart's figure under ``key``; ``build()`` makes it on a miss"""
+        spec = self.get(key, chart)
+        if spec is None:
+            spec = build().to_json()
+            self.put(key, chart, spec)
+        return pio.from_json(spec)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'nbytes': self.nbytes,
+            'budget_bytes': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,244 @@
+"""Bitmap index over the sidebar filter dimensions.
+
+Every filterable value owns a packed bitset of the rows holding it (rare values
+keep a sorted row-position list instead, which is smaller than a bitset). A
+filter state is answered by OR-ing the selected values within a dimension,
+AND-ing across dimensions and intersecting with a salary range taken from a
+pre-sorted salary index, producing a single row mask without copying the frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Sidebar dimension -> DataFrame column holding the values the sidebar shows
+FILTER_COLUMNS = {
+    'years': 'work_year',
+    'experience': 'experience_level_full',
+    'job_titles': 'job_title',
+    'remote': 'remote_work',
+    'company_size': 'company_size_full',
+    'locations': 'company_location',
+}
+
+_BIT_VALUES = (np.uint8(0x80) >> np.arange(8, dtype=np.uint8)).astype(np.uint8)
+
+
+def _set_bits(bits, positions):
+    """Set the bits at ``positions`` in a big-endian packed bitset in place"""
+    np.bitwise_or.at(bits, positions >> 3, _BIT_VALUES[positions & 7])
+
+
+def _clear_bits(bits, positions):
+    """Clear the bits at ``positions`` in a big-endian packed bitset in place"""
+    np.bitwise_and.at(bits, positions >> 3, ~_BIT_VALUES[positions & 7])
+
+
+class ColumnBitmap:
+    """Per-value row bitsets for one categorical column"""
+
+    def __init__(self, values):
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            uniques = list(values.cat.categories)
+        else:
+            codes, uniques = pd.factorize(values, sort=True)
+            uniques = list(uniques)
+
+        self.n_rows = len(codes)
+        self.n_bytes = (self.n_rows + 7) // 8
+        # A position list costs 32 bits per row, a bitset one bit per table row
+        sparse_limit = self.n_rows // 32
+
+        order = np.argsort(codes, kind='stable').astype(np.int64)
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        self.dense = {}
+        self.sparse = {}
+        for code, value in enumerate(uniques):
+            positions = order[bounds[code]:bounds[code + 1]]
+            if len(positions) == 0:
+                continue
+            key = _normalise_key(value)
+            if len(positions) > sparse_limit:
+                bits = np.zeros(self.n_bytes, dtype=np.uint8)
+                _set_bits(bits, positions)
+                self.dense[key] = bits
+            else:
+                self.sparse[key] = positions.astype(np.int32)
+
+    def extended(self, values, start):
+        """Return a copy indexing ``values`` as extra rows beginning at row ``start``"""
+        other = ColumnBitmap.__new__(ColumnBitmap)
+        other.n_rows = start + len(values)
+        other.n_bytes = (other.n_rows + 7) // 8
+        sparse_limit = other.n_rows // 32
+
+        appended = ColumnBitmap(values)
+        new_positions = {key: start + bits_to_positions(bits, appended.n_rows)
+                         for key, bits in appended.dense.items()}
+        new_positions.update({key: start + positions.astype(np.int64)
+                              for key, positions in appended.sparse.items()})
+
+        other.dense = {}
+        for key, bits in self.dense.items():
+            grown = np.zeros(other.n_bytes, dtype=np.uint8)
+            grown[:len(bits)] = bits
+            other.dense[key] = grown
+        other.sparse = dict(self.sparse)
+
+        for key, positions in new_positions.items():
+            if key in other.dense:
+                _set_bits(other.dense[key], positions)
+                continue
+            merged = np.concatenate([other.sparse.get(key, np.zeros(0, dtype=np.int32)),
+                                     positions.astype(np.int32)])
+            if len(merged) > sparse_limit:
+                bits = np.zeros(other.n_bytes, dtype=np.uint8)
+                _set_bits(bits, merged.astype(np.int64))
+                other.dense[key] = bits
+                other.sparse.pop(key, None)
+            else:
+                other.sparse[key] = merged
+        return other
+
+    def union(self, selected):
+        """Return the packed bitset of rows holding any of the ``selected`` values"""
+        bits = np.zeros(self.n_bytes, dtype=np.uint8)
+        for value in selected:
+            key = _normalise_key(value)
+            if key in self.dense:
+                bits |= self.dense[key]
+            elif key in self.sparse:
+                _set_bits(bits, self.sparse[key].astype(np.int64))
+        return bits
+
+    def nbytes(self):
+        return (sum(b.nbytes for b in self.dense.values())
+                + sum(p.nbytes for p in self.sparse.values()))
+
+
+def bits_to_positions(bits, n_rows):
+    """Row positions set in a packed bitset"""
+    return np.flatnonzero(np.unpackbits(bits, count=n_rows)).astype(np.int64)
+
+
+def _normalise_key(value):
+    # Sidebar widgets hand back numpy scalars, categories may be plain Python values
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class SalaryFilterIndex:
+    """Bitmap index answering the sidebar filter state with a single row mask"""
+
+    def __init__(self, df):
+        self.df = df
+        self.n_rows = len(df)
+        self.columns = {
+            dimension: ColumnBitmap(df[column])
+            for dimension, column in FILTER_COLUMNS.items()
+        }
+        salaries = df['salary_in_usd'].to_numpy()
+        self.salary_order = np.argsort(salaries, kind='stable').astype(np.int64)
+        self.sorted_salaries = salaries[self.salary_order]
+
+    def extended(self, df, start):
+        """Return an index over ``df`` reusing this index for rows before ``start``.
+
+        Only the appended rows are scanned: their positions are OR-ed into the
+        existing bitsets and merged into the sorted salary index.
+        """
+        other = SalaryFilterIndex.__new__(SalaryFilterIndex)
+        other.df = df
+        other.n_rows = len(df)
+        new_rows = df.iloc[start:]
+        other.columns = {
+            dimension: self.columns[dimension].extended(new_rows[column], start)
+            for dimension, column in FILTER_COLUMNS.items()
+        }
+        new_salaries = new_rows['salary_in_usd'].to_numpy()
+        new_order = np.argsort(new_salaries, kind='stable')
+        insert_at = np.searchsorted(self.sorted_salaries, new_salaries[new_order], side='right')
+        other.sorted_salaries = np.insert(self.sorted_salaries, insert_at, new_salaries[new_order])
+        other.salary_order = np.insert(self.salary_order, insert_at, start + new_order.astype(np.int64))
+        return other
+
+    def _salary_bits(self, salary_range):
+        """Packed bitset for an inclusive salary range, or None if it covers every row"""
+        lo = np.searchsorted(self.sorted_salaries, salary_range[0], side='left')
+        hi = np.searchsorted(self.sorted_salaries, salary_range[1], side='right')
+        if lo == 0 and hi == self.n_rows:
+            return None
+        n_bytes = (self.n_rows + 7) // 8
+        # Touch whichever side of the range is smaller
+        if hi - lo <= self.n_rows // 2:
+            bits = np.zeros(n_bytes, dtype=np.uint8)
+            _set_bits(bits, self.salary_order[lo:hi])
+        else:
+            bits = np.packbits(np.ones(self.n_rows, dtype=bool))
+            _clear_bits(bits, self.salary_order[:lo])
+            _clear_bits(bits, self.salary_order[hi:])
+        return bits
+
+    def row_mask(self, selections, salary_range=None):
+        """Return the packed row bitset for a filter state, or None when unfiltered.
+
+        ``selections`` maps a dimension from ``FILTER_COLUMNS`` to the selected
+        values; an empty selection leaves that dimension unconstrained.
+        """
+        mask = None
+        for dimension, selected in selections.items():
+            if selected is None or len(selected) == 0:
+                continue
+            bits = self.columns[dimension].union(selected)
+            mask = bits if mask is None else np.bitwise_and(mask, bits, out=mask)
+
+        if salary_range is not None:
+            bits = self._salary_bits(salary_range)
+            if bits is not None:
+                mask = bits if mask is None else np.bitwise_and(mask, bits, out=mask)
+        return mask
+
+    def select(self, selections, salary_range=None):
+        """Return a lazy ``FilteredView`` of the rows matching the filter state"""
+        mask = self.row_mask(selections, salary_range)
+        if mask is None:
+            return FilteredView(self.df, None)
+        rows = np.flatnonzero(np.unpackbits(mask, count=self.n_rows))
+        return FilteredView(self.df, rows)
+
+    def nbytes(self):
+        return (sum(c.nbytes() for c in self.columns.values())
+                + self.salary_order.nbytes + self.sorted_salaries.nbytes)
+
+
+class FilteredView:
+    """Row selection over the base frame that materialises columns on demand"""
+
+    def __init__(self, df, rows):
+        self._df = df
+        # None means every row, so the unfiltered case never copies anything
+        self.rows = rows
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._df) if self.rows is None else len(self.rows)
+
+    @property
+    def is_filtered(self):
+        return self.rows is not None
+
+    def column(self, name):
+        """Return one column restricted to the selected rows"""
+        if name not in self._columns:
+            series = self._df[name]
+            if self.rows is not None:
+                series = series.take(self.rows)
+            self._columns[name] = series
+        return self._columns[name]
+
+    def frame(self, *columns):
+        """Return a DataFrame holding only ``columns`` for the selected rows"""
+        return pd.DataFrame({name: self.column(name) for name in columns})
@@ -0,0 +1,260 @@
+"""Typed salary ingest with a columnar sidecar cache.
+
+The CSV is parsed once with an explicit schema and the cleaned frame is written
+next to it as a memory-mapped column store (see ``column_store``) keyed by a
+content hash of the CSV. Later starts, and every other server process, map the
+store read-only instead of re-parsing, sharing one copy of the data per host.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from column_store import STORE_SUFFIX, open_column_store, write_column_store
+
+# Outlier cut-off applied at load time
+MAX_SALARY_USD = 800000
+
+# Ordered category levels and their display labels
+EXPERIENCE_LEVELS = {'EN': 'Entry Level', 'MI': 'Mid Level', 'SE': 'Senior Level', 'EX': 'Executive Level'}
+EMPLOYMENT_TYPES = {'FT': 'Full Time', 'PT': 'Part Time', 'CT': 'Contract', 'FL': 'Freelance'}
+COMPANY_SIZES = {'S': 'Small', 'M': 'Medium', 'L': 'Large'}
+REMOTE_RATIOS = {0: 'On-site', 50: 'Hybrid', 100: 'Remote'}
+
+CSV_DTYPES = {
+    'work_year': 'int16',
+    'experience_level': pd.CategoricalDtype(list(EXPERIENCE_LEVELS), ordered=True),
+    'employment_type': pd.CategoricalDtype(list(EMPLOYMENT_TYPES), ordered=True),
+    'job_title': 'category',
+    'salary_currency': 'category',
+    'employee_residence': 'category',
+    'remote_ratio': 'int16',
+    'company_location': 'category',
+    'company_size': pd.CategoricalDtype(list(COMPANY_SIZES), ordered=True),
+}
+
+# Bump when the cleaned layout changes so stale sidecars are ignored
+SCHEMA_VERSION = 1
+
+SIDECAR_DIR = '.salary_cache'
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Return a content hash of the file at ``path``"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return f"v{SCHEMA_VERSION}-{digest.hexdigest()}"
+
+
+def _sidecar_paths(csv_path, fingerprint):
+    base_dir = os.path.join(os.path.dirname(os.path.abspath(csv_path)), SIDECAR_DIR)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    data_path = os.path.join(base_dir, f"{stem}-{fingerprint}{STORE_SUFFIX}")
+    meta_path = os.path.join(base_dir, f"{stem}-{fingerprint}.meta.json")
+    return data_path, meta_path
+
+
+def add_derived_columns(df):
+    """Add the human-readable ``*_full`` label columns as ordered categoricals"""
+    # Relabelling categories only touches the (tiny) category index, not every row
+    df['experience_level_full'] = df['experience_level'].cat.rename_categories(EXPERIENCE_LEVELS)
+    df['employment_type_full'] = df['employment_type'].cat.rename_categories(EMPLOYMENT_TYPES)
+    df['company_size_full'] = df['company_size'].cat.rename_categories(COMPANY_SIZES)
+    df['remote_work'] = pd.Categorical(
+        df['remote_ratio'].map(REMOTE_RATIOS),
+        categories=list(REMOTE_RATIOS.values()),
+        ordered=True,
+    )
+    return df
+
+
+def clean_salaries(df):
+    """Apply dtype coercion, outlier removal and derived columns to a raw frame"""
+    # Convert salary_in_usd to numeric, handling any errors
+    df['salary_in_usd'] = pd.to_numeric(df['salary_in_usd'], errors='coerce')
+
+    # Remove outliers with salaries above MAX_SALARY_USD (also drops unparseable rows)
+    df = df[df['salary_in_usd'] <= MAX_SALARY_USD].copy()
+    df['salary_in_usd'] = df['salary_in_usd'].astype('int32')
+
+    df = add_derived_columns(df)
+    return df.reset_index(drop=True)
+
+
+def read_salaries_csv(path):
+    """Parse the salary CSV with the explicit schema"""
+    # salary_in_usd is coerced afterwards so malformed values don't abort the parse
+    df = pd.read_csv(path, dtype=CSV_DTYPES)
+    return clean_salaries(df)
+
+
+# Columns a delta file must provide; extra columns are ignored
+REQUIRED_COLUMNS = [
+    'work_year', 'experience_level', 'employment_type', 'job_title', 'salary',
+    'salary_currency', 'salary_in_usd', 'employee_residence', 'remote_ratio',
+    'company_location', 'company_size',
+]
+
+
+def read_delta_csv(source, name=None):
+    """Parse and validate a CSV of new salary rows from a path or file object.
+
+    Returns the cleaned rows and the number of rows rejected by validation.
+    Raises ``ValueError`` when required columns are missing.
+    """
+    if name is None:
+        name = os.path.basename(source) if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '<upload>')
+    raw = pd.read_csv(source, dtype=str)
+    missing = [c for c in REQUIRED_COLUMNS if c not in raw.columns]
+    if missing:
+        raise ValueError(f"{name} is missing columns: {', '.join(missing)}")
+
+    work_year = pd.to_numeric(raw['work_year'], errors='coerce')
+    remote_ratio = pd.to_numeric(raw['remote_ratio'], errors='coerce')
+    salary = pd.to_numeric(raw['salary'], errors='coerce')
+    valid = (
+        work_year.notna()
+        & salary.notna()
+        & remote_ratio.isin(list(REMOTE_RATIOS))
+        & raw['experience_level'].isin(list(EXPERIENCE_LEVELS))
+        & raw['employment_type'].isin(list(EMPLOYMENT_TYPES))
+        & raw['company_size'].isin(list(COMPANY_SIZES))
+        & raw[['job_title', 'company_location', 'employee_residence', 'salary_currency']].notna().all(axis=1)
+    )
+
+    df = raw.loc[valid, REQUIRED_COLUMNS].copy()
+    df['work_year'] = work_year[valid]
+    df['remote_ratio'] = remote_ratio[valid]
+    df['salary'] = salary[valid].astype('int64')
+    df = clean_salaries(df.astype(CSV_DTYPES))
+    return df, len(raw) - len(df)
+
+
+def append_salaries(base, delta):
+    """Concatenate cleaned delta rows onto the base frame, unifying categories"""
+    base = base.copy(deep=False)
+    delta = delta[list(base.columns)].copy()
+    for column in base.columns:
+        dtype = base[column].dtype
+        if not isinstance(dtype, pd.CategoricalDtype) or dtype.ordered:
+            continue
+        # New titles/countries extend the category list; existing codes stay valid
+        new_values = [v for v in delta[column].cat.categories if v not in dtype.categories]
+        if new_values:
+            base[column] = base[column].cat.add_categories(new_values)
+        delta[column] = delta[column].cat.set_categories(base[column].cat.categories)
+    return pd.concat([base, delta], ignore_index=True)
+
+
+def _sorted_labels(series):
+    return sorted(str(v) for v in series.dropna().unique())
+
+
+def build_domain(df):
+    """Precompute the value domains used by the sidebar filters and predictor form"""
+    def observed(column):
+        # Preserve the logical category order, keeping only values present in the data
+        present = set(df[column].dropna().unique())
+        return [c for c in df[column].cat.categories if c in present]
+
+    return {
+        'years': sorted(int(y) for y in df['work_year'].unique()),
+        'experience_levels': observed('experience_level'),
+        'experience_labels': observed('experience_level_full'),
+        'employment_types': observed('employment_type'),
+        'company_sizes': observed('company_size'),
+        'company_size_labels': observed('company_size_full'),
+        'remote_ratios': sorted(int(r) for r in df['remote_ratio'].unique()),
+        'remote_labels': observed('remote_work'),
+        'job_titles': _sorted_labels(df['job_title']),
+        'locations': _sorted_labels(df['company_location']),
+        'residences': _sorted_labels(df['employee_residence']),
+        'min_salary': int(df['salary_in_usd'].min()) if len(df) else 0,
+        'max_salary': int(df['salary_in_usd'].max()) if len(df) else 0,
+        'n_rows': int(len(df)),
+    }
+
+
+# Logical order of the ordered-category domain lists
+_DOMAIN_ORDER = {
+    'experience_levels': list(EXPERIENCE_LEVELS),
+    'experience_labels': list(EXPERIENCE_LEVELS.values()),
+    'employment_types': list(EMPLOYMENT_TYPES),
+    'company_sizes': list(COMPANY_SIZES),
+    'company_size_labels': list(COMPANY_SIZES.values()),
+    'remote_labels': list(REMOTE_RATIOS.values()),
+}
+
+
+def merge_domain(domain, delta):
+    """Fold the value domains of newly appended rows into an existing domain"""
+    new = build_domain(delta)
+    if not new['n_rows']:
+        return domain
+    if not domain['n_rows']:
+        return new
+
+    merged = {}
+    for key, values in domain.items():
+        if key in _DOMAIN_ORDER:
+            present = set(values) | set(new[key])
+            merged[key] = [v for v in _DOMAIN_ORDER[key] if v in present]
+        elif key == 'min_salary':
+            merged[key] = min(values, new[key])
+        elif key == 'max_salary':
+            merged[key] = max(values, new[key])
+        elif key == 'n_rows':
+            merged[key] = values + new[key]
+        else:
+            merged[key] = sorted(set(values) | set(new[key]))
+    return merged
+
+
+def _write_sidecar(df, domain, data_path, meta_path):
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    write_column_store(df, data_path)
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(domain, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def _read_sidecar(data_path, meta_path):
+    df = open_column_store(data_path)
+    with open(meta_path) as f:
+        domain = json.load(f)
+    return df, domain
+
+
+def load_salaries(path='salaries.csv', use_sidecar=True):
+    """Load the cleaned salary frame and its domain metadata.
+
+    Maps the column store sidecar when its fingerprint matches the CSV content,
+    otherwise parses the CSV and (re)writes the sidecar, then maps that.
+    """
+    if not use_sidecar:
+        df = read_salaries_csv(path)
+        return df, build_domain(df)
+
+    fingerprint = file_fingerprint(path)
+    data_path, meta_path = _sidecar_paths(path, fingerprint)
+    if os.path.exists(data_path) and os.path.exists(meta_path):
+        try:
+            return _read_sidecar(data_path, meta_path)
+        except Exception:
+            # Corrupt or incompatible sidecar; drop it, fall through and rebuild it
+            shutil.rmtree(data_path, ignore_errors=True)
+
+    df = read_salaries_csv(path)
+    domain = build_domain(df)
+    try:
+        _write_sidecar(df, domain, data_path, meta_path)
+    except OSError:
+        # Read-only deployments still work, just without the shared warm-start cache
+        return df, domain
+    # Serve the mapped copy too, so this process shares pages with the others
+    return open_column_store(data_path), domain
@@ -0,0 +1,88 @@
+"""Split-conformal prediction intervals for the salary models.
+
+The held-out test split that ``train_models`` already scores is used as the
+calibration set: for each model, the absolute residuals are summarised into the
+finite-sample conformal quantile at the target coverage, globally and per
+segment (experience level x company location, then experience level alone).
+Segments with too few calibration rows fall back to the next coarser level, so
+every profile gets an interval. The widths are computed once at training time
+and stored in the model bundle; an interval query is a dictionary lookup.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from ml_pipeline import SCALED_MODELS
+
+# Target probability that the true salary falls inside the interval
+COVERAGE = 0.9
+
+# Calibration rows a segment needs before it gets its own width
+MIN_SEGMENT_SIZE = 30
+
+# Segmentations tried in order, finest first
+SEGMENT_LEVELS = (('experience_level', 'company_location'), ('experience_level',))
+
+
+def conformal_quantile(residuals, coverage=COVERAGE):
+    """Finite-sample split-conformal quantile of absolute residuals"""
+    n = len(residuals)
+    level = math.ceil((n + 1) * coverage) / n
+    if level > 1:
+        return math.inf
+    return float(np.quantile(residuals, level, method='higher'))
+
+
+class ConformalIntervals:
+    """Calibrated interval half-widths for one model"""
+
+    def __init__(self, y_pred, y_true, segments, coverage=COVERAGE, min_segment_size=MIN_SEGMENT_SIZE):
+        """Calibrate from test-set predictions.
+
+        ``segments`` is a frame aligned with ``y_true`` holding the raw (decoded)
+        segment feature values of each calibration row.
+        """
+        residuals = pd.Series(np.abs(np.asarray(y_true, dtype='float64') - np.asarray(y_pred, dtype='float64')),
+                              index=segments.index)
+        self.coverage = coverage
+        self.n_calibration = len(residuals)
+        self.global_width = conformal_quantile(residuals.to_numpy(), coverage)
+        # (segment feature values...) -> (half-width, calibration rows)
+        self.widths = {}
+        for level in SEGMENT_LEVELS:
+            grouped = residuals.groupby([segments[feature] for feature in level], observed=True)
+            for key, group in grouped:
+                if len(group) >= min_segment_size:
+                    key = key if isinstance(key, tuple) else (key,)
+                    self.widths[tuple(str(k) for k in key)] = (conformal_quantile(group.to_numpy(), coverage), len(group))
+
+    def width(self, features):
+        """``(half-width, segment description, calibration rows)`` for a raw profile"""
+        for level in SEGMENT_LEVELS:
+            key = tuple(str(features[feature]) for feature in level)
+            if key in self.widths:
+                width, n = self.widths[key]
+                return width, ' / '.join(key), n
+        return self.global_width, 'all profiles', self.n_calibration
+
+    def interval(self, predicted, features):
+        """``(lower, upper, segment description, calibration rows)``; the lower bound is clipped at 0"""
+        width, segment, n = self.width(features)
+        return max(predicted - width, 0.0), predicted + width, segment, n
+
+
+def fit_intervals(trained_models, scaler, label_encoders, X_test, y_test, coverage=COVERAGE):
+    """Calibrate a ``ConformalIntervals`` per model on the held-out test split"""
+    segment_features = sorted({feature for level in SEGMENT_LEVELS for feature in level})
+    segments = pd.DataFrame(
+        {feature: label_encoders[feature].inverse_transform(X_test[feature].to_numpy()) for feature in segment_features},
+        index=X_test.index,
+    )
+    intervals = {}
+    for name, model in trained_models.items():
+        features = scaler.transform(X_test) if name in SCALED_MODELS else X_test
+        y_pred = np.maximum(model.predict(features), 0)
+        intervals[name] = ConformalIntervals(y_pred, y_test, segments, coverage)
+    return intervals
@@ -0,0 +1,57 @@
+"""Deferred imports for the heavy modelling libraries.
+
+``lazy_import('xgboost')`` returns a stand-in that imports the real module the
+first time one of its attributes is read, so scikit-learn, XGBoost, SHAP and
+joblib are only paid for by the code paths (model training, loading,
+explanations) that actually use them rather than by every process start. The
+time each first import took is recorded in ``IMPORT_TIMES`` for the startup
+report.
+"""
+
+import importlib
+import threading
+import time
+
+# Module name -> seconds its deferred import took
+IMPORT_TIMES = {}
+
+_lock = threading.RLock()
+_proxies = {}
+
+
+class LazyModule:
+    """Module stand-in that imports ``name`` on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            # Sessions run on separate threads; only one performs (and times) the import
+            with _lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    IMPORT_TIMES[self._name] = time.perf_counter() - start
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Shared ``LazyModule`` for ``name``"""
+    with _lock:
+        if name not in _proxies:
+            _proxies[name] = LazyModule(name)
+        return _proxies[name]
@@ -0,0 +1,76 @@
+"""Similar-profile salary index for the predictor's Market Comparison.
+
+For each matching level (experience x title x location, then progressively
+coarser keys) the salaries are sorted once, grouped by key, and the key mapped
+to its slice of the sorted array. A lookup is a dictionary probe, and the
+percentile of a predicted salary among its peers is a ``searchsorted``.
+"""
+
+import numpy as np
+
+# Keys tried in order until one has matching profiles
+MARKET_LEVELS = (
+    ('experience_level', 'job_title', 'company_location'),
+    ('experience_level', 'job_title'),
+    ('job_title',),
+    ('experience_level', 'company_location'),
+)
+
+
+class MarketMatch:
+    """Sorted salaries of the profiles matching a key"""
+
+    def __init__(self, level, key, salaries):
+        self.level = level
+        self.key = key
+        self.salaries = salaries
+
+    def __len__(self):
+        return len(self.salaries)
+
+    @property
+    def exact(self):
+        """True when matched on the full key rather than a fallback"""
+        return self.level == MARKET_LEVELS[0]
+
+    def mean(self):
+        return float(self.salaries.mean())
+
+    def percentile(self, salary):
+        """Share of matching salaries strictly below ``salary``, in percent"""
+        return 100.0 * np.searchsorted(self.salaries, salary, side='left') / len(self.salaries)
+
+
+class MarketIndex:
+    """(experience, title, location)-style keys -> pre-sorted salary arrays"""
+
+    def __init__(self, df, levels=MARKET_LEVELS):
+        self.levels = levels
+        salary = df['salary_in_usd'].to_numpy()
+        self._sorted = {}
+        self._slices = {}
+        for level in levels:
+            grouped = df.groupby(list(level), observed=True, sort=True)
+            group_ids = grouped.ngroup().to_numpy()
+            # Group-major, salary-minor order puts each key's salaries in one sorted run
+            order = np.lexsort((salary, group_ids))
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(group_ids))])
+            keys = grouped.size().index
+            self._sorted[level] = salary[order]
+            self._slices[level] = {
+                tuple(str(k) for k in (key if isinstance(key, tuple) else (key,))): (bounds[i], bounds[i + 1])
+                for i, key in enumerate(keys)
+            }
+
+    def lookup(self, features):
+        """Best available ``MarketMatch`` for a raw profile, or None if even the fallbacks are empty"""
+        for level in self.levels:
+            key = tuple(str(features[column]) for column in level)
+            bounds = self._slices[level].get(key)
+            if bounds is not None:
+                start, end = bounds
+                return MarketMatch(level, key, self._sorted[level][start:end])
+        return None
+
+    def nbytes(self):
+        return sum(salaries.nbytes for salaries in self._sorted.values())
@@ -0,0 +1,253 @@
+"""Feature preparation, model training and prediction for the salary predictor"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from category_encoder import UNKNOWN_CODE, CategoryEncoder
+from lazy_imports import lazy_import
+
+# scikit-learn and XGBoost load on first use, so importing this module for
+# FEATURES or encoding does not pay for them
+model_selection = lazy_import('sklearn.model_selection')
+preprocessing = lazy_import('sklearn.preprocessing')
+metrics = lazy_import('sklearn.metrics')
+
+# Model inputs, in feature-vector order
+FEATURES = ['work_year', 'experience_level', 'employment_type', 'job_title',
+            'company_location', 'company_size', 'remote_ratio']
+CATEGORICAL_FEATURES = ['experience_level', 'employment_type', 'job_title', 'company_location', 'company_size']
+
+# Everything that changes the trained artifacts; part of the model registry key
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+HYPERPARAMETERS = {
+    'Random Forest': {'n_estimators': 100, 'random_state': RANDOM_STATE},
+    'XGBoost': {'n_estimators': 100, 'random_state': RANDOM_STATE},
+    'Gradient Boosting': {'n_estimators': 100, 'random_state': RANDOM_STATE},
+    'Linear Regression': {},
+}
+
+# Estimator classes as (module, class name), resolved on first use by model_class()
+MODEL_CLASSES = {
+    'Random Forest': ('sklearn.ensemble', 'RandomForestRegressor'),
+    'XGBoost': ('xgboost', 'XGBRegressor'),
+    'Gradient Boosting': ('sklearn.ensemble', 'GradientBoostingRegressor'),
+    'Linear Regression': ('sklearn.linear_model', 'LinearRegression'),
+}
+
+# Models fitted on standardised features
+SCALED_MODELS = {'Linear Regression'}
+
+# Estimator parameter controlling internal parallelism; models not listed fit on one core
+THREAD_PARAMS = {'Random Forest': 'n_jobs', 'XGBoost': 'n_jobs'}
+
+
+def model_class(name):
+    """Estimator class for a model name, importing its library if needed"""
+    module, class_name = MODEL_CLASSES[name]
+    return getattr(lazy_import(module), class_name)
+
+
+def prepare_ml_data(df):
+    """Prepare data for machine learning"""
+    # Create feature dataframe
+    X = df[FEATURES].copy()
+    y = df['salary_in_usd'].copy()
+
+    # Encode categorical variables
+    label_encoders = {}
+    for feature in CATEGORICAL_FEATURES:
+        encoder = CategoryEncoder.fit(X[feature])
+        X[feature] = encoder.transform(X[feature])
+        label_encoders[feature] = encoder
+
+    return X, y, label_encoders
+
+
+def allocate_threads(names, n_cores=None):
+    """Split the available cores between concurrently fitted models.
+
+    Single-threaded models get one core each and the multi-threaded ensembles
+    share the rest, so the pool never runs more threads than there are cores.
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    threaded = [name for name in names if name in THREAD_PARAMS]
+    serial = [name for name in names if name not in THREAD_PARAMS]
+    spare = max(n_cores - len(serial), len(threaded))
+    threads = {name: 1 for name in serial}
+    for i, name in enumerate(threaded):
+        # Hand out the remainder one core at a time to the first ensembles
+        threads[name] = max(1, spare // len(threaded) + (1 if i < spare % len(threaded) else 0))
+    return threads
+
+
+def _fit_and_predict(name, params, n_threads, X_fit, y_fit, X_eval):
+    """Fit one model and time its fit and test-set predict; runs in a worker process"""
+    if name in THREAD_PARAMS:
+        params = {**params, THREAD_PARAMS[name]: n_threads}
+    model = model_class(name)(**params)
+    # Cap BLAS/OpenMP pools too, so e.g. the linear model doesn't grab every core
+    with threadpool_limits(limits=n_threads):
+        start = time.perf_counter()
+        model.fit(X_fit, y_fit)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_pred = model.predict(X_eval)
+        predict_time = time.perf_counter() - start
+    return model, y_pred, fit_time, predict_time
+
+
+def process_context():
+    """Start method for worker pools.
+
+    Forking copies a multithreaded process (the Streamlit server) with whatever
+    locks its other threads held at that moment, so workers come from a clean
+    forkserver, or are spawned where there is none.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _run_fits(jobs, threads, parallel):
+    """Run ``_fit_and_predict`` for each job, in a process pool when ``parallel``"""
+    if parallel and len(jobs) > 1 and (os.cpu_count() or 1) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count()),
+                                     mp_context=process_context()) as pool:
+                futures = {name: pool.submit(_fit_and_predict, name, params, threads[name], *data)
+                           for name, (params, data) in jobs.items()}
+                return {name: future.result() for name, future in futures.items()}
+        except (BrokenProcessPool, OSError, PermissionError):
+            # Sandboxed hosts may forbid subprocesses; fall back to fitting in-process
+            pass
+    return {name: _fit_and_predict(name, params, threads[name], *data)
+            for name, (params, data) in jobs.items()}
+
+
+def train_models(X, y, parallel=True):
+    """Train multiple ML models"""
+    # Split data
+    X_train, X_test, y_train, y_test = model_selection.train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+    # Scale features
+    scaler = preprocessing.StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    # Fit the models concurrently, each sized to its share of the cores
+    jobs = {
+        name: (params, (X_train_scaled, y_train, X_test_scaled) if name in SCALED_MODELS
+               else (X_train, y_train, X_test))
+        for name, params in HYPERPARAMETERS.items()
+    }
+    threads = allocate_threads(list(jobs))
+    fits = _run_fits(jobs, threads, parallel)
+
+    # Evaluate models
+    model_results = {}
+    trained_models = {}
+
+    for name in HYPERPARAMETERS:
+        model, y_pred, fit_time, predict_time = fits[name]
+        if name == 'Random Forest':
+            # Single-row predictions are slower through a joblib thread pool
+            model.set_params(n_jobs=None)
+
+        # Calculate metrics
+        mae = metrics.mean_absolute_error(y_test, y_pred)
+        mse = metrics.mean_squared_error(y_test, y_pred)
+        rmse = np.sqrt(mse)
+        r2 = metrics.r2_score(y_test, y_pred)
+
+        model_results[name] = {
+            'MAE': mae,
+            'RMSE': rmse,
+            'R²': r2,
+            'Fit Time (s)': fit_time,
+            'Predict Time (s)': predict_time,
+            'model': model
+        }
+        trained_models[name] = model
+
+    return model_results, trained_models, scaler, X_test, y_test
+
+
+def encode_features(label_encoders, profiles):
+    """Encode raw profiles into the model feature matrix in one pass.
+
+    ``profiles`` is a frame, or any mapping of ``FEATURES`` to equal-length
+    sequences. Returns the float feature matrix and a per-row status: ``'ok'`` or
+    a message naming the first feature whose value the encoders have never seen.
+    """
+    n_rows = len(profiles[FEATURES[0]])
+    matrix = np.zeros((n_rows, len(FEATURES)), dtype='float64')
+    status = np.full(n_rows, 'ok', dtype=object)
+
+    for i, feature in enumerate(FEATURES):
+        values = profiles[feature]
+        if feature not in label_encoders:
+            numeric = np.asarray(pd.to_numeric(values, errors='coerce'), dtype='float64')
+            bad = np.isnan(numeric) & (status == 'ok')
+            status[bad] = f"invalid {feature}"
+            matrix[:, i] = np.nan_to_num(numeric)
+            continue
+
+        codes = label_encoders[feature].transform(values)
+        first_unknown = (codes == UNKNOWN_CODE) & (status == 'ok')
+        if first_unknown.any():
+            labels = np.asarray(values).astype(str)[first_unknown]
+            status[first_unknown] = [f"unknown {feature}: {label}" for label in labels]
+        matrix[:, i] = codes
+
+    return matrix, status
+
+
+def _score(model, scaler, matrix, model_name):
+    """Non-negative salary predictions for an encoded feature matrix"""
+    if model_name in SCALED_MODELS:
+        matrix = scaler.transform(matrix)
+    # Ensure non-negative predictions
+    return np.maximum(model.predict(matrix), 0)
+
+
+def predict_salary_batch(model, scaler, label_encoders, profiles, model_name):
+    """Predict salaries for a frame of profiles with one model call.
+
+    ``profiles`` needs the ``FEATURES`` columns. Returns a frame aligned with it
+    holding ``predicted_salary`` (NaN where the row could not be scored) and
+    ``status``.
+    """
+    missing = [feature for feature in FEATURES if feature not in profiles.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+
+    matrix, status = encode_features(label_encoders, profiles)
+    valid = status == 'ok'
+    predictions = np.full(len(profiles), np.nan)
+    if valid.any():
+        predictions[valid] = _score(model, scaler, matrix[valid], model_name)
+
+    return pd.DataFrame({'predicted_salary': predictions, 'status': status}, index=profiles.index)
+
+
+def encode_profile(label_encoders, features):
+    """Encode one profile dict into a 1-row feature matrix; raises ``ValueError`` for unseen values"""
+    # Same encoding as the batch path, minus the DataFrame round trip
+    row, status = encode_features(label_encoders, {feature: [features[feature]] for feature in FEATURES})
+    if status[0] != 'ok':
+        raise ValueError(status[0])
+    return row
+
+
+def predict_salary(model, scaler, label_encoders, features, model_name):
+    """Make salary prediction"""
+    # Shares encoding and scoring with predict_salary_batch
+    return float(_score(model, scaler, encode_profile(label_encoders, features), model_name)[0])
@@ -0,0 +1,132 @@
+"""On-disk registry of trained salary model artifacts.
+
+A bundle (fitted estimators, scaler, label encoders, evaluation metrics, the
+held-out test split and the prediction intervals calibrated on it) is saved with joblib under a key derived from the dataset
+fingerprint and the training hyperparameters. Any process that asks for the
+same key loads the bundle from disk instead of retraining. Bundles are saved
+uncompressed and loaded with ``mmap_mode='r'``, so their large arrays (the
+encoded test matrix, the compiled forests) are mapped read-only and shared
+between the server processes on a host.
+"""
+
+import hashlib
+import json
+import os
+import time
+from importlib.metadata import version
+
+import intervals
+import ml_pipeline
+from lazy_imports import lazy_import
+from tree_engine import compile_models
+
+joblib = lazy_import('joblib')
+
+REGISTRY_DIR = 'models'
+INDEX_FILE = 'registry.json'
+
+# Bump when the bundle contents change so older bundles are not reused
+BUNDLE_FORMAT = 5
+
+
+def artifact_key(dataset_fingerprint):
+    """Registry key for a dataset fingerprint under the current training settings"""
+    spec = {
+        'format': BUNDLE_FORMAT,
+        'dataset': dataset_fingerprint,
+        'features': ml_pipeline.FEATURES,
+        'hyperparameters': ml_pipeline.HYPERPARAMETERS,
+        'test_size': ml_pipeline.TEST_SIZE,
+        'random_state': ml_pipeline.RANDOM_STATE,
+        'interval_coverage': intervals.COVERAGE,
+        'interval_min_segment': intervals.MIN_SEGMENT_SIZE,
+        # Pickled estimators are only safe to reload under the library versions that wrote them
+        # (read from package metadata, which does not import the libraries)
+        'sklearn': version('scikit-learn'),
+        'xgboost': version('xgboost'),
+    }
+    encoded = json.dumps(spec, sort_keys=True).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class ModelRegistry:
+    """Directory of joblib model bundles keyed by ``artifact_key``"""
+
+    def __init__(self, directory=REGISTRY_DIR):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.joblib")
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def read_index(self):
+        """Return the registry index: key -> metadata of each saved bundle"""
+        try:
+            with open(self._index_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, key):
+        """Return the bundle stored under ``key``, or None if absent or unreadable"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path, mmap_mode='r')
+        except Exception:
+            return None
+
+    def save(self, key, bundle, metadata=None):
+        """Persist ``bundle`` under ``key`` and record it in the index"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temp name first so a concurrent loader never sees a partial file
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        joblib.dump(bundle, tmp_path)
+        os.replace(tmp_path, self._path(key))
+
+        index = self.read_index()
+        index[key] = {'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'), **(metadata or {})}
+        tmp_index = f"{self._index_path()}.{os.getpid()}.tmp"
+        with open(tmp_index, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_index, self._index_path())
+
+    def load_or_train(self, df, dataset_fingerprint):
+        """Return ``(bundle, loaded_from_disk)`` for the given training data"""
+        key = artifact_key(dataset_fingerprint)
+        bundle = self.load(key)
+        if bundle is not None:
+            return bundle, True
+
+        X, y, label_encoders = ml_pipeline.prepare_ml_data(df)
+        model_results, trained_models, scaler, X_test, y_test = ml_pipeline.train_models(X, y)
+        bundle = {
+            'key': key,
+            'dataset_fingerprint': dataset_fingerprint,
+            'model_results': model_results,
+            'trained_models': trained_models,
+            # Flat-array forests for low-latency small-batch scoring
+            'compiled_models': compile_models(trained_models),
+            'scaler': scaler,
+            'label_encoders': label_encoders,
+            'X_test': X_test,
+            'y_test': y_test,
+            # Conformal interval widths calibrated on the test split
+            'intervals': intervals.fit_intervals(trained_models, scaler, label_encoders, X_test, y_test),
+        }
+        try:
+            self.save(key, bundle, metadata={
+                'dataset_fingerprint': dataset_fingerprint,
+                'n_rows': int(len(df)),
+                'metrics': {
+                    name: {metric: float(value) for metric, value in result.items() if metric != 'model'}
+                    for name, result in model_results.items()
+                },
+            })
+        except OSError:
+            # Read-only deployments still get the freshly trained models
+            pass
+        return bundle, False
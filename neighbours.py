@@ -0,0 +1,131 @@
+"""k-nearest-neighbour search for comparable historical salaries.
+
+Profiles are embedded from the ``prepare_ml_data`` feature matrix: ordered
+categories (experience, company size) by their rank, nominal ones (title,
+location, employment type) by a smoothed mean log-salary of their category,
+and numeric features as-is. Columns are standardised and scaled by per-feature
+weights. Survey rows collapse onto a few thousand distinct profile points, so
+the KD-tree is built over those points, each owning a sorted run of its rows'
+salaries; queries stay in the millisecond range however many rows share a point.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ingest import COMPANY_SIZES, EXPERIENCE_LEVELS
+from lazy_imports import lazy_import
+from ml_pipeline import CATEGORICAL_FEATURES, FEATURES, encode_features, prepare_ml_data
+
+neighbors = lazy_import('sklearn.neighbors')
+
+# Relative importance of each feature in the distance
+FEATURE_WEIGHTS = {
+    'work_year': 0.5,
+    'experience_level': 2.0,
+    'employment_type': 0.5,
+    'job_title': 2.0,
+    'company_location': 1.5,
+    'company_size': 0.5,
+    'remote_ratio': 0.5,
+}
+
+# Categories embedded by their position in the natural order rather than by salary
+ORDINAL_LEVELS = {
+    'experience_level': list(EXPERIENCE_LEVELS),
+    'company_size': list(COMPANY_SIZES),
+}
+
+# Pseudo-count pulling rare categories' mean log-salary towards the overall mean
+SMOOTHING_ROWS = 10
+
+DEFAULT_K = 50
+
+
+class ComparableIndex:
+    """KD-tree over weighted profile embeddings of the survey rows"""
+
+    def __init__(self, df, weights=FEATURE_WEIGHTS):
+        X, y, self.label_encoders = prepare_ml_data(df)
+        log_salary = np.log(np.maximum(y.to_numpy(dtype='float64'), 1.0))
+
+        # Per categorical feature: code -> coordinate, with a trailing entry for UNKNOWN_CODE
+        self._coordinates = {}
+        for feature in CATEGORICAL_FEATURES:
+            classes = self.label_encoders[feature].classes_
+            codes = X[feature].to_numpy()
+            if feature in ORDINAL_LEVELS:
+                coordinates = np.array([ORDINAL_LEVELS[feature].index(c) for c in classes], dtype='float64')
+            else:
+                counts = np.bincount(codes, minlength=len(classes))
+                sums = np.bincount(codes, weights=log_salary, minlength=len(classes))
+                coordinates = (sums + SMOOTHING_ROWS * log_salary.mean()) / (counts + SMOOTHING_ROWS)
+            # Unknown values sit at the feature's mean, contributing no preference either way
+            self._coordinates[feature] = np.append(coordinates, coordinates[codes].mean())
+
+        raw = self._embed_raw(X[FEATURES].to_numpy(dtype='float64'))
+        self._center = raw.mean(axis=0)
+        scale = raw.std(axis=0)
+        self._scale = np.where(scale > 0, scale, 1.0) / np.array([weights[feature] for feature in FEATURES])
+        points = (raw - self._center) / self._scale
+
+        # Collapse identical profiles; each distinct point owns a salary-sorted run
+        unique_points, point_ids = np.unique(points, axis=0, return_inverse=True)
+        point_ids = point_ids.ravel()
+        salary = y.to_numpy()
+        order = np.lexsort((salary, point_ids))
+        self._salaries = salary[order]
+        self._bounds = np.concatenate([[0], np.cumsum(np.bincount(point_ids, minlength=len(unique_points)))])
+        self.tree = neighbors.KDTree(unique_points)
+        self.n_rows = len(df)
+
+    @property
+    def n_points(self):
+        return len(self._bounds) - 1
+
+    def _embed_raw(self, matrix):
+        raw = matrix.copy()
+        for i, feature in enumerate(FEATURES):
+            if feature in self._coordinates:
+                # UNKNOWN_CODE (-1) indexes the trailing neutral coordinate
+                raw[:, i] = self._coordinates[feature][matrix[:, i].astype(np.int64)]
+        return raw
+
+    def embed(self, profiles):
+        """Weighted, standardised coordinates for a frame of raw profiles"""
+        matrix, _ = encode_features(self.label_encoders, profiles)
+        return (self._embed_raw(matrix) - self._center) / self._scale
+
+    def _gather(self, point_indices, k):
+        # Nearest points first; stop once they hold k salaries
+        counts = np.diff(self._bounds)[point_indices]
+        n_points = int(np.searchsorted(np.cumsum(counts), k)) + 1
+        runs = [self._salaries[self._bounds[p]:self._bounds[p + 1]] for p in point_indices[:n_points]]
+        # The farthest point may hold more rows than needed; sample its sorted run
+        # evenly rather than keeping only its lowest salaries
+        needed = k - sum(len(run) for run in runs[:-1])
+        runs[-1] = runs[-1][np.linspace(0, len(runs[-1]) - 1, needed).round().astype(int)]
+        return np.concatenate(runs)
+
+    def comparables(self, features, k=DEFAULT_K):
+        """Salaries of the ``k`` most comparable survey rows to a raw profile"""
+        return self.query(pd.DataFrame([features]), k)[0]
+
+    def query(self, profiles, k=DEFAULT_K):
+        """List of comparable salary arrays, one per profile row"""
+        k = min(k, self.n_rows)
+        # Every point holds at least one row, so k points always cover k salaries
+        _, indices = self.tree.query(self.embed(profiles), k=min(k, self.n_points))
+        return [self._gather(row, k) for row in indices]
+
+    def summarise(self, profiles, k=DEFAULT_K):
+        """Per-profile comparable salary statistics, aligned with ``profiles``"""
+        stats = np.array([
+            [len(salaries), np.median(salaries), *np.percentile(salaries, [25, 75])]
+            for salaries in self.query(profiles, k)
+        ])
+        return pd.DataFrame({
+            'comparable_count': stats[:, 0].astype(int),
+            'comparable_median': stats[:, 1],
+            'comparable_p25': stats[:, 2],
+            'comparable_p75': stats[:, 3],
+        }, index=profiles.index)
@@ -0,0 +1,260 @@
+"""Standalone HTTP salary prediction service with request micro-batching.
+
+Loads the same data snapshot, encoders and models as the dashboard (through the
+model registry) and serves them over a small JSON API:
+
+    POST /predict   {"model": "XGBoost", "profiles": [{...feature values...}, ...]}
+                    (a single profile may be sent as "profile": {...}; add
+                    "comparables": k for the k nearest historical salaries' median/IQR)
+    GET  /stats     latency percentiles, throughput and batching statistics
+    GET  /health    liveness check
+
+Concurrent requests arriving within ``--window-ms`` of each other are coalesced
+into one vectorized ``model.predict`` call per model.
+
+Run next to the dashboard with:
+
+    python prediction_server.py --port 8502
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from ml_pipeline import FEATURES, predict_salary_batch
+from model_registry import ModelRegistry
+from salary_store import SalaryStore
+from tree_engine import scoring_model
+
+DEFAULT_MODEL = 'XGBoost'
+
+
+class LatencyStats:
+    """Rolling request latency and throughput statistics"""
+
+    def __init__(self, window=10000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._completed = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self.started = time.monotonic()
+        self.requests = 0
+        self.rows = 0
+
+    def record_request(self, latency, n_rows):
+        with self._lock:
+            self._latencies.append(latency)
+            self._completed.append(time.monotonic())
+            self.requests += 1
+            self.rows += n_rows
+
+    def record_batch(self, n_requests):
+        with self._lock:
+            self._batch_sizes.append(n_requests)
+
+    def summary(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            completed = np.array(self._completed)
+            batch_sizes = np.array(self._batch_sizes)
+            requests, rows = self.requests, self.rows
+        now = time.monotonic()
+        # Throughput over the last minute of completed requests
+        recent = completed[completed >= now - 60] if len(completed) else completed
+        span = min(60.0, now - self.started)
+        return {
+            'requests': requests,
+            'rows': rows,
+            'p50_ms': float(np.percentile(latencies, 50) * 1000) if len(latencies) else None,
+            'p99_ms': float(np.percentile(latencies, 99) * 1000) if len(latencies) else None,
+            'throughput_rps': float(len(recent) / span) if span > 0 else 0.0,
+            'batches': int(len(batch_sizes)),
+            'mean_batch_requests': float(batch_sizes.mean()) if len(batch_sizes) else None,
+        }
+
+
+class MicroBatcher:
+    """Coalesces concurrent prediction requests into vectorized model calls"""
+
+    def __init__(self, bundle, window_ms=5.0, max_batch_rows=4096, stats=None):
+        self.bundle = bundle
+        self.window = window_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self.stats = stats or LatencyStats()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, profiles, model_name):
+        """Queue a frame of profiles; returns a Future resolving to the result frame"""
+        if model_name not in self.bundle['trained_models']:
+            raise ValueError(f"Unknown model: {model_name}")
+        future = Future()
+        self._queue.put((profiles, model_name, future))
+        return future
+
+    def _collect(self):
+        """Block for one request, then gather more until the window closes or the batch fills"""
+        batch = [self._queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = time.monotonic() + self.window
+        while n_rows < self.max_batch_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.stats.record_batch(len(batch))
+            by_model = {}
+            for item in batch:
+                by_model.setdefault(item[1], []).append(item)
+            for model_name, items in by_model.items():
+                self._predict(model_name, items)
+
+    def _predict(self, model_name, items):
+        frames = [profiles for profiles, _, _ in items]
+        try:
+            combined = pd.concat(frames, ignore_index=True)
+            results = predict_salary_batch(
+                scoring_model(self.bundle, model_name, len(combined)),
+                self.bundle['scaler'],
+                self.bundle['label_encoders'],
+                combined,
+                model_name,
+            )
+        except Exception as e:
+            for _, _, future in items:
+                future.set_exception(e)
+            return
+        # Hand each request back its own slice of the combined result
+        offset = 0
+        for profiles, _, future in items:
+            future.set_result(results.iloc[offset:offset + len(profiles)])
+            offset += len(profiles)
+
+
+class PredictionServer(ThreadingHTTPServer):
+    # Bursts of concurrent clients are the point of micro-batching; the default
+    # listen backlog of 5 would reset their connections
+    request_queue_size = 256
+
+
+def make_handler(batcher, comparable_index=None, timeout=30.0):
+    """Build the request handler class bound to ``batcher`` (and optionally a ``ComparableIndex``)"""
+
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok', 'models': list(batcher.bundle['trained_models'])})
+            elif self.path == '/stats':
+                self._send_json(200, batcher.stats.summary())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': 'not found'})
+                return
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                records = request.get('profiles')
+                if records is None and 'profile' in request:
+                    records = [request['profile']]
+                if not isinstance(records, list) or not records:
+                    raise ValueError("Send a non-empty 'profiles' list or a 'profile' object")
+                profiles = pd.DataFrame.from_records(records)
+                missing = [feature for feature in FEATURES if feature not in profiles.columns]
+                if missing:
+                    raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+                model_name = request.get('model', DEFAULT_MODEL)
+                future = batcher.submit(profiles[FEATURES], model_name)
+                n_comparables = request.get('comparables')
+                comparables = None
+                if n_comparables:
+                    if comparable_index is None:
+                        raise ValueError("Comparable search is not enabled on this server")
+                    comparables = comparable_index.summarise(profiles[FEATURES], int(n_comparables))
+                results = future.result(timeout=timeout)
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            except Exception as e:
+                self._send_json(500, {'error': str(e)})
+                return
+
+            predictions = [
+                {'predicted_salary': None if np.isnan(salary) else float(salary), 'status': status}
+                for salary, status in zip(results['predicted_salary'], results['status'])
+            ]
+            if comparables is not None:
+                for prediction, row in zip(predictions, comparables.to_dict('records')):
+                    prediction.update(row)
+            batcher.stats.record_request(time.perf_counter() - start, len(profiles))
+            self._send_json(200, {'model': model_name, 'predictions': predictions})
+
+        def log_message(self, format, *args):
+            # Per-request access logs would dominate the latency we are measuring
+            pass
+
+    return PredictionHandler
+
+
+def load_bundle(data_path='salaries.csv', model_dir='models', store=None):
+    """Resolve the model bundle for the current data snapshot, as the dashboard does"""
+    snapshot = (store or SalaryStore(data_path)).training_snapshot
+    bundle, _ = ModelRegistry(model_dir).load_or_train(snapshot.df, snapshot.fingerprint)
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve salary predictions over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--data', default='salaries.csv', help="Salary CSV the models were trained on")
+    parser.add_argument('--model-dir', default='models', help="Model registry directory")
+    parser.add_argument('--window-ms', type=float, default=5.0, help="Micro-batching window")
+    parser.add_argument('--max-batch-rows', type=int, default=4096)
+    args = parser.parse_args()
+
+    store = SalaryStore(args.data)
+    bundle = load_bundle(model_dir=args.model_dir, store=store)
+    batcher = MicroBatcher(bundle, window_ms=args.window_ms, max_batch_rows=args.max_batch_rows)
+    server = PredictionServer((args.host, args.port), make_handler(batcher, store.snapshot.comparable_index))
+    print(f"Serving salary predictions on http://{args.host}:{args.port} (models: {', '.join(bundle['trained_models'])})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Precomputed salary predictions over the finite feature space.
+
+Every model input is categorical or near-categorical, so predictions can be
+computed once for the cartesian product of feature values (or a configured
+subset of it) and stored in a dense float32 array indexed by per-feature
+positions. A form submit then becomes a dictionary lookup per feature plus one
+array read. Tables are tied to the model artifact key they were built from
+(``artifact_key``), so callers cache them under that key and build a fresh one
+when it changes.
+"""
+
+import time
+
+import numpy as np
+
+from category_encoder import UNKNOWN_CODE
+from ml_pipeline import FEATURES, SCALED_MODELS
+
+# Rows scored per model.predict call while building
+BUILD_CHUNK_ROWS = 1 << 18
+
+# Default restriction of the enumerated space: only the latest survey year, which
+# keeps the table to a few MB per model. Feature values outside the table fall
+# back to a live model call.
+DEFAULT_SUBSET = {'work_year': 'latest'}
+
+
+def table_axes(label_encoders, domain, subset=None):
+    """Values to enumerate per feature: the full training domain, narrowed by ``subset``.
+
+    ``subset`` maps a feature to an explicit list of values, or ``work_year`` to
+    ``'latest'`` for the most recent year only.
+    """
+    axes = {
+        'work_year': list(domain['years']),
+        'remote_ratio': list(domain['remote_ratios']),
+    }
+    for feature, encoder in label_encoders.items():
+        axes[feature] = list(encoder.classes_)
+    for feature, values in (subset or {}).items():
+        if feature == 'work_year' and values == 'latest':
+            values = [max(axes['work_year'])]
+        axes[feature] = list(values)
+    return axes
+
+
+class PredictionTable:
+    """Dense prediction array for one model over a grid of feature values"""
+
+    def __init__(self, bundle, model_name, axes, chunk_rows=BUILD_CHUNK_ROWS):
+        """Build the table.
+
+        ``axes`` maps each feature in ``FEATURES`` to the raw values to enumerate
+        (e.g. the years and remote ratios to cover, or a subset of titles).
+        Categorical values the encoders have never seen are dropped.
+        """
+        start = time.perf_counter()
+        self.artifact_key = bundle['key']
+        self.model_name = model_name
+        label_encoders = bundle['label_encoders']
+
+        self.axis_values = []
+        encoded_axes = []
+        for feature in FEATURES:
+            values = list(axes[feature])
+            if feature in label_encoders:
+                encoder = label_encoders[feature]
+                values = [v for v in values if encoder.encode(v) != UNKNOWN_CODE]
+                encoded = np.array([encoder.encode(v) for v in values], dtype='float64')
+            else:
+                encoded = np.array(values, dtype='float64')
+            self.axis_values.append(values)
+            encoded_axes.append(encoded)
+
+        # Precompiled value -> axis position maps for O(1) lookups
+        self._positions = [{_key(v): i for i, v in enumerate(values)} for values in self.axis_values]
+        self.shape = tuple(len(values) for values in self.axis_values)
+        self.values = np.empty(self.shape, dtype=np.float32)
+
+        model = bundle['trained_models'][model_name]
+        flat = self.values.reshape(-1)
+        for chunk_start in range(0, flat.size, chunk_rows):
+            positions = np.unravel_index(np.arange(chunk_start, min(chunk_start + chunk_rows, flat.size)), self.shape)
+            matrix = np.column_stack([axis[pos] for axis, pos in zip(encoded_axes, positions)])
+            if model_name in SCALED_MODELS:
+                matrix = bundle['scaler'].transform(matrix)
+            flat[chunk_start:chunk_start + len(matrix)] = np.maximum(model.predict(matrix), 0)
+
+        self.build_seconds = time.perf_counter() - start
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    @property
+    def size(self):
+        return self.values.size
+
+    def index_of(self, features):
+        """Array index of a profile, or None if any value lies outside the table"""
+        index = []
+        for feature, positions in zip(FEATURES, self._positions):
+            position = positions.get(_key(features[feature]))
+            if position is None:
+                return None
+            index.append(position)
+        return tuple(index)
+
+    def lookup(self, features):
+        """Precomputed prediction for a profile, or None if it is not covered"""
+        index = self.index_of(features)
+        return None if index is None else float(self.values[index])
+
+
+def _key(value):
+    # Form widgets may hand back numpy scalars; normalise to plain Python values
+    if isinstance(value, np.generic):
+        value = value.item()
+    return str(value) if isinstance(value, str) else value
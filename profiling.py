@@ -0,0 +1,128 @@
+"""Per-stage timing and memory hooks for one run of the app script.
+
+``app.py`` wraps its named stages (data refresh, filtering, each tab's
+aggregations, each figure, model loading, predictions) in ``profile.stage(...)``.
+Wall time is always recorded, which costs two ``perf_counter`` calls per stage;
+with memory tracing on, each stage also records the peak of memory allocated
+while it ran, via ``tracemalloc``. A profiled run's report is shown in the
+sidebar "Performance" expander and logged as one JSON line, so slow reruns can
+be traced in production without attaching a profiler. Set
+``SALARY_APP_PROFILE=1`` to log every rerun of every session, and
+``SALARY_APP_PROFILE_LOG`` to a path to also append the reports there as JSON
+lines.
+
+tracemalloc is process-wide: peaks include whatever other sessions allocate at
+the same time, and tracing slows every allocation while any session has it on.
+Stages must not nest, since each one resets the traced peak.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+
+PROFILE_ENV_VAR = 'SALARY_APP_PROFILE'
+PROFILE_LOG_ENV_VAR = 'SALARY_APP_PROFILE_LOG'
+
+logger = logging.getLogger(__name__)
+
+_trace_lock = threading.Lock()
+_log_lock = threading.Lock()
+_tracing_runs = 0
+_started_tracing = False
+
+
+def _start_tracing():
+    global _tracing_runs, _started_tracing
+    with _trace_lock:
+        if _tracing_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_runs += 1
+
+
+def _stop_tracing():
+    global _tracing_runs, _started_tracing
+    with _trace_lock:
+        _tracing_runs -= 1
+        # Leave tracing alone if something else in the process turned it on
+        if _tracing_runs == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class RunProfile:
+    """Named stage timings (and optional memory peaks) of one script run"""
+
+    def __init__(self, trace_memory=False, log=False):
+        self.trace_memory = trace_memory
+        self.log = log
+        # (stage, seconds, peak bytes or None)
+        self.stages = []
+        self._start = time.perf_counter()
+        self._finished = False
+        self._release = None
+        if trace_memory:
+            _start_tracing()
+            # A rerun interrupted before finish() still releases tracing once collected
+            self._release = weakref.finalize(self, _stop_tracing)
+
+    @contextmanager
+    def stage(self, name):
+        """Record the wall time (and traced memory peak) of the enclosed block as ``name``"""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - baseline if self.trace_memory else None
+            self.stages.append((name, seconds, peak))
+
+    def report(self):
+        total = time.perf_counter() - self._start
+        staged = sum(seconds for _, seconds, _ in self.stages)
+        return {
+            'total_seconds': total,
+            'unstaged_seconds': max(total - staged, 0.0),
+            'trace_memory': self.trace_memory,
+            'stages': [
+                {'stage': name, 'seconds': seconds, 'peak_bytes': peak}
+                for name, seconds, peak in self.stages
+            ],
+        }
+
+    def finish(self):
+        """Stop memory tracing, log the report when enabled, and return it"""
+        report = self.report()
+        if not self._finished:
+            self._finished = True
+            if self._release is not None:
+                self._release()
+            if self.log:
+                _write_log(report)
+        return report
+
+
+def _write_log(report):
+    line = json.dumps({'timestamp': time.time(), **report})
+    logger.info("rerun profile: %s", line)
+    path = os.environ.get(PROFILE_LOG_ENV_VAR)
+    if path:
+        try:
+            with _log_lock, open(path, 'a') as f:
+                f.write(line + '\n')
+        except OSError as e:
+            logger.warning("could not write profile log %s: %s", path, e)
+
+
+def begin_run(profile=False, trace_memory=False):
+    """Profile for the current run; ``SALARY_APP_PROFILE`` forces logging on"""
+    log = profile or os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0')
+    return RunProfile(trace_memory=profile and trace_memory, log=log)
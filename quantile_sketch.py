@@ -0,0 +1,143 @@
+"""Mergeable quantile sketches for salary medians and percentiles.
+
+Salaries are counted in logarithmically spaced buckets (the DDSketch scheme):
+bucket ``k`` covers ``(gamma**(k-1), gamma**k]`` with
+``gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)``. Reporting the
+bucket midpoint ``2 * gamma**k / (gamma + 1)`` puts every order statistic within
+``RELATIVE_ACCURACY`` (1%) of the exact salary at its rank, whatever the data
+distribution; quantiles interpolate between the two ranks around ``q * (n - 1)``
+as pandas does, so they stay within 1% of ``Series.quantile`` even for the
+handful of rows in a small or even-sized group. Sketches merge by adding bucket counts, so any union of
+segments is answered exactly as well as a sketch built over its raw rows.
+
+Values below 1 (e.g. zero salaries) share bucket 0 and are reported as ~1.
+"""
+
+import numpy as np
+
+RELATIVE_ACCURACY = 0.01
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+
+
+def bucket_keys(values):
+    """Map salaries to their log-spaced bucket keys"""
+    values = np.maximum(np.asarray(values, dtype='float64'), 1.0)
+    return np.ceil(np.log(values) / _LOG_GAMMA).astype(np.int64)
+
+
+def bucket_values(keys):
+    """Representative salary of each bucket key"""
+    return 2 * np.power(_GAMMA, keys) / (_GAMMA + 1)
+
+
+def histogram_quantiles(counts, q):
+    """Quantiles from dense bucket-count histograms.
+
+    ``counts`` is ``(n_keys,)`` or ``(n_groups, n_keys)``; ``q`` is a scalar or a
+    sequence of quantiles. Empty histograms yield NaN.
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype='float64'))
+    q = np.atleast_1d(np.asarray(q, dtype='float64'))
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1:] if counts.shape[1] else np.zeros((len(counts), 1))
+    # pandas' default 'linear' convention: interpolate between the elements at
+    # 0-based ranks floor(q * (n - 1)) and the next one up
+    positions = q[None, :] * np.maximum(totals - 1, 0)
+    lower = np.floor(positions)
+    upper = np.minimum(lower + 1, np.maximum(totals - 1, 0))
+    lower_keys = np.empty((len(counts), len(q)), dtype=np.int64)
+    upper_keys = np.empty((len(counts), len(q)), dtype=np.int64)
+    for row in range(len(counts)):
+        lower_keys[row] = np.searchsorted(cumulative[row], lower[row], side='right')
+        upper_keys[row] = np.searchsorted(cumulative[row], upper[row], side='right')
+    low, high = bucket_values(lower_keys), bucket_values(upper_keys)
+    result = low + (high - low) * (positions - lower)
+    result[np.broadcast_to(totals == 0, result.shape)] = np.nan
+    return result
+
+
+class QuantileSketch:
+    """A single mergeable salary sketch"""
+
+    def __init__(self, counts=None):
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, values):
+        keys = bucket_keys(values)
+        return cls(np.bincount(keys) if len(keys) else None)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def merge(self, other):
+        """Return a new sketch counting the values of both sketches"""
+        size = max(len(self.counts), len(other.counts))
+        counts = np.zeros(size, dtype=np.int64)
+        counts[:len(self.counts)] += self.counts
+        counts[:len(other.counts)] += other.counts
+        return QuantileSketch(counts)
+
+    def quantile(self, q):
+        """Approximate quantile(s) within ``RELATIVE_ACCURACY`` relative error"""
+        result = histogram_quantiles(self.counts, q)[0]
+        return float(result[0]) if np.ndim(q) == 0 else result
+
+
+class SegmentSketches:
+    """One sketch per segment, stored sparsely as (segment, bucket, count) entries"""
+
+    def __init__(self, segment_ids, values, n_segments):
+        keys = bucket_keys(values)
+        self.n_segments = n_segments
+        self.n_keys = int(keys.max()) + 1 if len(keys) else 0
+        combined = np.asarray(segment_ids, dtype=np.int64) * max(self.n_keys, 1) + keys
+        combined, counts = np.unique(combined, return_counts=True)
+        self.entry_segment = combined // max(self.n_keys, 1)
+        self.entry_key = combined % max(self.n_keys, 1)
+        self.entry_count = counts
+
+    @classmethod
+    def combined(cls, parts, n_segments):
+        """Combine ``(sketches, segment_map)`` pairs into one set of ``n_segments`` sketches.
+
+        ``segment_map`` renumbers each part's segments into the combined numbering;
+        entries that land on the same segment and bucket are summed.
+        """
+        n_keys = max(part.n_keys for part, _ in parts)
+        segments = np.concatenate([np.asarray(mapping)[part.entry_segment] for part, mapping in parts])
+        keys = np.concatenate([part.entry_key for part, _ in parts])
+        counts = np.concatenate([part.entry_count for part, _ in parts])
+        combined, inverse = np.unique(segments * max(n_keys, 1) + keys, return_inverse=True)
+
+        result = cls.__new__(cls)
+        result.n_segments = n_segments
+        result.n_keys = n_keys
+        result.entry_segment = combined // max(n_keys, 1)
+        result.entry_key = combined % max(n_keys, 1)
+        result.entry_count = np.bincount(inverse.ravel(), weights=counts, minlength=len(combined)).astype(np.int64)
+        return result
+
+    def merge(self, segments):
+        """Merge the sketches of ``segments`` into one ``QuantileSketch``"""
+        selected = np.zeros(self.n_segments, dtype=bool)
+        selected[np.asarray(segments, dtype=np.int64)] = True
+        mask = selected[self.entry_segment]
+        counts = np.bincount(self.entry_key[mask], weights=self.entry_count[mask], minlength=self.n_keys)
+        return QuantileSketch(counts.astype(np.int64))
+
+    def merge_groups(self, segments, group_codes, n_groups):
+        """Merge ``segments`` into ``n_groups`` histograms, ``group_codes`` aligned with ``segments``"""
+        segment_group = np.full(self.n_segments, -1, dtype=np.int64)
+        segment_group[np.asarray(segments, dtype=np.int64)] = group_codes
+        groups = segment_group[self.entry_segment]
+        mask = groups >= 0
+        flat = groups[mask] * self.n_keys + self.entry_key[mask]
+        counts = np.bincount(flat, weights=self.entry_count[mask], minlength=n_groups * self.n_keys)
+        return counts.reshape(n_groups, self.n_keys)
+
+    def nbytes(self):
+        return self.entry_segment.nbytes + self.entry_key.nbytes + self.entry_count.nbytes
@@ -0,0 +1,178 @@
+"""Pre-aggregated salary cube serving the dashboard tab aggregates.
+
+The cube holds count / sum / sum of squares / min / max of ``salary_in_usd`` for
+every observed combination of the dimension columns, plus a mergeable quantile
+sketch per cell for medians and percentiles. Tabs roll matching cells up to the
+grouping they chart, so their cost scales with the number of cells rather than
+the number of salary rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from filter_index import FILTER_COLUMNS
+from quantile_sketch import SegmentSketches, histogram_quantiles
+
+# Experience, company size and remote ratio are stored through their ordered
+# display labels, which map one-to-one onto the raw codes
+CUBE_DIMENSIONS = [
+    'work_year',
+    'experience_level_full',
+    'employment_type',
+    'job_title',
+    'company_location',
+    'employee_residence',
+    'company_size_full',
+    'remote_work',
+]
+
+MEASURES = ['count', 'sum', 'sumsq', 'min', 'max']
+
+
+class SalaryCube:
+    """Materialised salary aggregates over ``CUBE_DIMENSIONS``"""
+
+    def __init__(self, df):
+        salary = df['salary_in_usd'].astype('float64')
+        frame = df[CUBE_DIMENSIONS].assign(salary=salary, salary_sq=salary * salary)
+        grouped = frame.groupby(CUBE_DIMENSIONS, observed=True)
+        cells = grouped.agg(
+            count=('salary', 'size'),
+            sum=('salary', 'sum'),
+            sumsq=('salary_sq', 'sum'),
+            min=('salary', 'min'),
+            max=('salary', 'max'),
+        )
+        self.cells = cells.reset_index()
+        # ngroup() numbers groups in the same sorted order as the aggregated cells
+        self.sketches = SegmentSketches(grouped.ngroup().to_numpy(), salary.to_numpy(), len(self.cells))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def nbytes(self):
+        return int(self.cells.memory_usage(deep=True).sum()) + self.sketches.nbytes()
+
+    def merged(self, other):
+        """Return a cube combining this cube's cells with those of ``other``"""
+        left, right = _unify_dimension_categories(self.cells, other.cells)
+        stacked = pd.concat([left, right], ignore_index=True)
+        grouped = stacked.groupby(CUBE_DIMENSIONS, observed=True)
+        cells = grouped.agg(
+            count=('count', 'sum'),
+            sum=('sum', 'sum'),
+            sumsq=('sumsq', 'sum'),
+            min=('min', 'min'),
+            max=('max', 'max'),
+        ).reset_index()
+        new_ids = grouped.ngroup().to_numpy()
+
+        result = SalaryCube.__new__(SalaryCube)
+        result.cells = cells
+        result.sketches = SegmentSketches.combined(
+            [(self.sketches, new_ids[:len(left)]), (other.sketches, new_ids[len(left):])],
+            len(cells),
+        )
+        return result
+
+    def slice(self, selections=None):
+        """Return the cells matching a sidebar filter state (see ``FILTER_COLUMNS``)"""
+        cells = self.cells
+        mask = None
+        for dimension, selected in (selections or {}).items():
+            if selected is None or len(selected) == 0:
+                continue
+            matches = cells[FILTER_COLUMNS[dimension]].isin(list(selected)).to_numpy()
+            mask = matches if mask is None else mask & matches
+        return CubeSlice(cells if mask is None else cells[mask], self.sketches)
+
+
+class CubeSlice:
+    """A subset of cube cells that can be rolled up to any grouping"""
+
+    def __init__(self, cells, sketches):
+        self.cells = cells
+        self.sketches = sketches
+
+    @property
+    def count(self):
+        return int(self.cells['count'].sum())
+
+    def rollup(self, *by):
+        """Aggregate the cells by ``by`` into count, mean, std, min, max and sum"""
+        grouped = self.cells.groupby(list(by), observed=True).agg(
+            count=('count', 'sum'),
+            sum=('sum', 'sum'),
+            sumsq=('sumsq', 'sum'),
+            min=('min', 'min'),
+            max=('max', 'max'),
+        ).reset_index()
+        return _finalise(grouped)
+
+    def total(self):
+        """Aggregate every cell into a single row of statistics"""
+        cells = self.cells
+        grouped = pd.DataFrame({
+            'count': [cells['count'].sum()],
+            'sum': [cells['sum'].sum()],
+            'sumsq': [cells['sumsq'].sum()],
+            'min': [cells['min'].min() if len(cells) else np.nan],
+            'max': [cells['max'].max() if len(cells) else np.nan],
+        })
+        return _finalise(grouped).iloc[0]
+
+    def scaled(self, factor):
+        """Return the slice with cell counts multiplied by ``factor``, keeping each cell's mean and spread.
+
+        Scales aggregates of a uniform row sample back up to the rows it stands
+        for; the sketches only set quantiles, which scaling leaves unchanged.
+        """
+        cells = self.cells.copy()
+        count = (cells['count'] * factor).round().clip(lower=1).astype(cells['count'].dtype)
+        ratio = count / cells['count']
+        cells['sum'] = cells['sum'] * ratio
+        cells['sumsq'] = cells['sumsq'] * ratio
+        cells['count'] = count
+        return CubeSlice(cells, self.sketches)
+
+    def restrict(self, column, values):
+        """Return the cells whose ``column`` value is in ``values``"""
+        return CubeSlice(self.cells[self.cells[column].isin(list(values))], self.sketches)
+
+    def quantiles(self, q):
+        """Approximate salary quantile(s) over the slice from the merged cell sketches"""
+        return self.sketches.merge(self.cells.index.to_numpy()).quantile(q)
+
+    def group_quantile(self, by, q, name='quantile'):
+        """Approximate salary quantile ``q`` for each value of ``by``"""
+        return self.group_quantiles(by, [q], [name])
+
+    def group_quantiles(self, by, q, names):
+        """Approximate salary quantiles ``q`` (one column per name) for each value of ``by``"""
+        codes, groups = pd.factorize(self.cells[by])
+        counts = self.sketches.merge_groups(self.cells.index.to_numpy(), codes, len(groups))
+        values = histogram_quantiles(counts, q)
+        return pd.DataFrame({by: groups, **{name: values[:, i] for i, name in enumerate(names)}})
+
+
+def _unify_dimension_categories(left, right):
+    """Give the unordered categorical dimensions of both frames the same categories"""
+    left = left.copy(deep=False)
+    right = right.copy(deep=False)
+    for column in CUBE_DIMENSIONS:
+        dtype = left[column].dtype
+        if not isinstance(dtype, pd.CategoricalDtype) or dtype.ordered:
+            continue
+        categories = dtype.categories.union(right[column].cat.categories, sort=False)
+        left[column] = left[column].cat.set_categories(categories)
+        right[column] = right[column].cat.set_categories(categories)
+    return left, right
+
+
+def _finalise(grouped):
+    count = grouped['count'].astype('float64')
+    grouped['mean'] = grouped['sum'] / count
+    # Sample variance from the merged moments, matching pandas' ddof=1 std
+    variance = (grouped['sumsq'] - grouped['sum'] ** 2 / count) / (count - 1)
+    grouped['std'] = np.sqrt(variance.clip(lower=0)).where(count > 1)
+    return grouped.drop(columns='sumsq')
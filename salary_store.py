@@ -0,0 +1,227 @@
+"""Shared salary data with incremental append ingestion.
+
+A single ``SalaryStore`` per server process holds the cleaned frame together with
+its domain metadata, filter index and salary cube. New survey rows are dropped
+as CSV files into a watched delta directory; ``refresh()`` tails each file,
+validates only the complete rows it has not read before and folds them into the
+existing structures, publishing a new immutable ``SalarySnapshot`` so sessions
+mid-rerun keep a consistent view.
+
+Under a memory budget too small for the full frame the store loads out of core
+(see ``chunked_ingest``): the cube and domain still cover every row, while the
+snapshot's frame and filter index hold a uniform sample at ``sample_rate``.
+"""
+
+import glob
+import hashlib
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+
+import numpy as np
+
+from chunked_ingest import SAMPLE_SEED, load_chunked, memory_budget_from_env, needs_chunking
+from filter_index import SalaryFilterIndex
+from ingest import append_salaries, file_fingerprint, load_salaries, merge_domain, read_delta_csv
+from market_index import MarketIndex
+from neighbours import ComparableIndex
+from salary_cube import SalaryCube
+
+DELTA_DIR = 'salary_deltas'
+
+# Minimum seconds between two scans of the delta directory
+POLL_INTERVAL = 5.0
+
+
+@dataclass(frozen=True)
+class SalarySnapshot:
+    """Consistent view of the salary data at one data version"""
+    df: object
+    domain: dict
+    filter_index: SalaryFilterIndex
+    cube: SalaryCube
+    version: int
+    # Content hash of the base CSV plus every delta file folded in
+    fingerprint: str
+    # Delta file reads folded into this snapshot, as (file name, rows added, rows rejected);
+    # a file that keeps growing appears once per read of its new rows
+    deltas: tuple = field(default_factory=tuple)
+    # Share of all rows held in ``df``; below 1 only in out-of-core mode
+    sample_rate: float = 1.0
+
+    @property
+    def n_rows(self):
+        """Rows in the full data set, including any not held in ``df``"""
+        return self.domain['n_rows']
+
+    @cached_property
+    def market_index(self):
+        """Similar-profile salary index, built on first use per snapshot"""
+        # cached_property writes the instance __dict__ directly, so this works on the frozen dataclass
+        return MarketIndex(self.df)
+
+    @cached_property
+    def comparable_index(self):
+        """k-nearest-neighbour comparable-profile index, built on first use per snapshot"""
+        return ComparableIndex(self.df)
+
+
+class SalaryStore:
+    """Process-wide salary data that grows as delta files arrive"""
+
+    def __init__(self, path='salaries.csv', delta_dir=DELTA_DIR, poll_interval=POLL_INTERVAL,
+                 memory_budget=None):
+        self.path = path
+        self.delta_dir = delta_dir
+        self.poll_interval = poll_interval
+        # Bytes the loaded data may occupy; None loads everything in memory
+        self.memory_budget = memory_budget if memory_budget is not None else memory_budget_from_env()
+        self.errors = {}
+        # Per delta file name: bytes already ingested, its header line and the size
+        # seen at the last poll. Files are tailed, so rows appended to a file are read
+        # once each and a rewritten file is never ingested twice
+        self._consumed = {}
+        self._headers = {}
+        self._observed = {}
+        self._lock = threading.Lock()
+        self._last_poll = 0.0
+        # Samples delta rows at the snapshot's rate in out-of-core mode
+        self._rng = np.random.default_rng(SAMPLE_SEED)
+
+        fingerprint = file_fingerprint(path)
+        if self.memory_budget is not None and needs_chunking(path, self.memory_budget):
+            loaded = load_chunked(path, self.memory_budget, fingerprint)
+            self._snapshot = SalarySnapshot(
+                df=loaded.sample,
+                domain=loaded.domain,
+                filter_index=loaded.filter_index,
+                cube=loaded.cube,
+                version=0,
+                fingerprint=fingerprint,
+                sample_rate=loaded.sample_rate,
+            )
+        else:
+            df, domain = load_salaries(path)
+            self._snapshot = SalarySnapshot(
+                df=df,
+                domain=domain,
+                filter_index=SalaryFilterIndex(df),
+                cube=SalaryCube(df),
+                version=0,
+                fingerprint=fingerprint,
+            )
+        self.refresh(force=True)
+        # Models are trained against this snapshot until retrain() advances it
+        self._training_snapshot = self._snapshot
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def training_snapshot(self):
+        return self._training_snapshot
+
+    @property
+    def models_stale(self):
+        """True when rows have been appended since the models' training snapshot"""
+        return self._training_snapshot.version != self._snapshot.version
+
+    def retrain(self):
+        """Point model training at the latest snapshot"""
+        self._training_snapshot = self._snapshot
+
+    def _pending_files(self):
+        """Delta files that have grown since last read, with the byte offset already ingested"""
+        if not os.path.isdir(self.delta_dir):
+            return []
+        pending = []
+        for path in sorted(glob.glob(os.path.join(self.delta_dir, '*.csv'))):
+            name = os.path.basename(path)
+            size = os.stat(path).st_size
+            consumed = self._consumed.get(name, 0)
+            if size < consumed:
+                self.errors[name] = (f"shrank below the {consumed:,} bytes already ingested; "
+                                     "rewritten delta files are not re-read")
+            elif size > consumed:
+                pending.append((path, consumed))
+        return pending
+
+    def refresh(self, force=False):
+        """Fold any new delta files into the store; returns the current snapshot"""
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return self._snapshot
+        # Only one session does the work; the others keep serving the last snapshot
+        if not self._lock.acquire(blocking=False):
+            return self._snapshot
+        try:
+            self._last_poll = now
+            for path, offset in self._pending_files():
+                self._apply(path, offset)
+        finally:
+            self._lock.release()
+        return self._snapshot
+
+    def _read_tail(self, path, offset):
+        """Bytes of the complete lines after ``offset``, plus the file's header line"""
+        name = os.path.basename(path)
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+        # A file still being written may end mid-row: stop at the last newline, unless
+        # the size has not moved since the previous poll (a final row with no newline)
+        size = offset + len(tail)
+        if self._observed.get(name) != size:
+            tail = tail[:tail.rfind(b'\n') + 1]
+        self._observed[name] = size
+        if offset == 0:
+            header_end = tail.find(b'\n') + 1
+            self._headers[name] = tail[:header_end] if header_end else tail
+        return self._headers.get(name, b''), tail
+
+    def _apply(self, path, offset):
+        name = os.path.basename(path)
+        try:
+            header, tail = self._read_tail(path, offset)
+        except OSError as e:
+            self.errors[name] = str(e)
+            return
+        if not tail:
+            return
+        # Each byte of a delta file is ingested at most once, even when it fails validation
+        self._consumed[name] = offset + len(tail)
+        body = tail[len(header):] if offset == 0 else tail
+        try:
+            delta, rejected = read_delta_csv(io.BytesIO(header + body), name)
+        except ValueError as e:
+            self.errors[name] = str(e)
+            return
+        self.errors.pop(name, None)
+        content_hash = hashlib.blake2b(tail, digest_size=16).hexdigest()
+
+        current = self._snapshot
+        deltas = current.deltas + ((name, len(delta), rejected),)
+        if len(delta) == 0:
+            self._snapshot = replace(current, deltas=deltas)
+            return
+
+        # The cube and domain take every new row, the sampled frame its usual share
+        sampled = delta
+        if current.sample_rate < 1.0:
+            sampled = delta[self._rng.random(len(delta)) < current.sample_rate]
+        start = len(current.df)
+        df = append_salaries(current.df, sampled)
+        self._snapshot = SalarySnapshot(
+            df=df,
+            domain=merge_domain(current.domain, delta),
+            filter_index=current.filter_index.extended(df, start),
+            cube=current.cube.merged(SalaryCube(delta)),
+            version=current.version + 1,
+            fingerprint=hashlib.blake2b(f"{current.fingerprint}+{content_hash}".encode(), digest_size=16).hexdigest(),
+            deltas=deltas,
+            sample_rate=current.sample_rate,
+        )
@@ -0,0 +1,130 @@
+"""Cold-start timing for the dashboard.
+
+``app.py`` imports this module before anything else, so the first script run in
+a process can time its own imports. Each session times its stages (imports,
+data load, first render of whichever tab it opened on) until a run gets its
+first tab on screen; the first such report in a process is the cold start. A
+run interrupted by a rerun before that point does not lose the measurement: the
+next run carries on from the same start and books the time in between as
+``earlier runs``. Libraries
+deferred through ``lazy_imports`` are listed with their import cost once some
+code path has loaded them.
+
+Target: the first tab's time to first paint (imports + data load + first
+render) stays under ``TIME_TO_FIRST_PAINT_TARGET`` seconds on a cold process
+with a warm sidecar cache.
+
+Measure a cold start with:
+
+    python startup_report.py
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from lazy_imports import IMPORT_TIMES
+
+TIME_TO_FIRST_PAINT_TARGET = 2.0
+
+logger = logging.getLogger(__name__)
+
+_MODULE_LOADED = time.perf_counter()
+_lock = threading.Lock()
+_first_run_started = False
+
+# Report of the process's cold-start run, once it has rendered its first tab
+COLD_START_REPORT = None
+
+
+class StartupTimer:
+    """Wall-clock time of the stages of one script run"""
+
+    def __init__(self, start, cold):
+        self.cold = cold
+        self.start = start
+        self.stages = []
+        self._last = start
+
+    def mark(self, stage):
+        """Close ``stage``: it took the time since the previous mark"""
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    @property
+    def elapsed(self):
+        return self._last - self.start
+
+    def report(self):
+        return {
+            'cold': self.cold,
+            'stages': dict(self.stages),
+            'time_to_first_paint': self.elapsed,
+            'target': TIME_TO_FIRST_PAINT_TARGET,
+            'within_target': self.elapsed <= TIME_TO_FIRST_PAINT_TARGET,
+            'deferred_imports': dict(IMPORT_TIMES),
+        }
+
+    def finish(self):
+        """Record the report; the first cold one to reach its first render is kept and logged"""
+        global COLD_START_REPORT
+        report = self.report()
+        with _lock:
+            if not self.cold or COLD_START_REPORT is not None:
+                return report
+            COLD_START_REPORT = report
+        logger.info("cold start: %s", json.dumps(report))
+        return report
+
+
+def begin_run(session_start=None):
+    """Timer for the current script run.
+
+    Until some run has rendered its first tab, runs are cold and time from this
+    module's import. Otherwise they time from ``session_start``, the start of the
+    session's first run, or from now when this is that first run.
+    """
+    global _first_run_started
+    with _lock:
+        cold = COLD_START_REPORT is None
+        resumed = _first_run_started if cold else session_start is not None
+        _first_run_started = True
+    if cold:
+        start = _MODULE_LOADED
+    else:
+        start = time.perf_counter() if session_start is None else session_start
+    timer = StartupTimer(start, cold)
+    if resumed:
+        # An earlier run (or a concurrent session's) got this far without rendering;
+        # its share of the wait is not this run's imports
+        timer.mark('earlier runs')
+    return timer
+
+
+def main():
+    # Streamlit itself is imported by the test harness before the app runs, so
+    # the imports stage covers the app's own dependencies
+    from streamlit.testing.v1 import AppTest
+
+    # The app records into the importable module, not this __main__ copy
+    import startup_report
+
+    # Run from the directory holding salaries.csv
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'), default_timeout=600)
+    app.run()
+    report = startup_report.COLD_START_REPORT
+    if report is None:
+        raise SystemExit("The app did not finish rendering its first tab")
+    for stage, seconds in report['stages'].items():
+        print(f"{stage:<16}{seconds:>8.3f}s")
+    status = 'within' if report['within_target'] else 'OVER'
+    print(f"{'first paint':<16}{report['time_to_first_paint']:>8.3f}s  ({status} the {report['target']:.1f}s target)")
+    for module, seconds in report['deferred_imports'].items():
+        print(f"  deferred import {module}: {seconds:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
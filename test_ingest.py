@@ -0,0 +1,27 @@
+import io
+
+import pytest
+
+from ingest import read_delta_csv
+
+HEADER = ('work_year,experience_level,employment_type,job_title,salary,salary_currency,'
+          'salary_in_usd,employee_residence,remote_ratio,company_location,company_size\n')
+ROW = '2024,SE,FT,Data Scientist,150000,USD,150000,US,100,US,M\n'
+
+
+def test_delta_buffer_missing_columns_raises_validation_error():
+    buffer = io.StringIO('work_year,job_title\n2024,Data Scientist\n')
+    with pytest.raises(ValueError, match=r'<upload> is missing columns: experience_level'):
+        read_delta_csv(buffer)
+
+
+def test_delta_buffer_error_uses_given_name():
+    with pytest.raises(ValueError, match=r'^d1\.csv is missing columns'):
+        read_delta_csv(io.BytesIO(b'work_year\n2024\n'), 'd1.csv')
+
+
+def test_delta_buffer_rejects_invalid_rows():
+    buffer = io.StringIO(HEADER + ROW + '2024,XX,FT,Data Scientist,150000,USD,150000,US,100,US,M\n')
+    df, rejected = read_delta_csv(buffer)
+    assert len(df) == 1
+    assert rejected == 1
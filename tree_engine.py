@@ -0,0 +1,217 @@
+"""Compiled flat-array inference for the tree ensembles.
+
+``compile_model`` exports a fitted Random Forest, Gradient Boosting or XGBoost
+regressor into one struct-of-arrays forest: per-node feature, threshold, left
+and right child and leaf value arrays, with every tree's nodes concatenated.
+``CompiledForest.predict`` then walks all trees for all rows at once with a few
+NumPy gathers per tree level, which skips the per-call validation and Python
+overhead that dominate native single-row predicts.
+
+Splits are normalised to ``x <= threshold`` on float32 inputs: sklearn compares
+float32 features against float64 thresholds with ``<=``, and XGBoost compares
+float32 features with ``<``, so both are rounded down to the float32 threshold
+giving the same decisions. Leaves point at themselves, so extra levels are no-ops.
+
+Benchmark against the native models with:
+
+    python tree_engine.py --rows 1 100 100000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+ensemble = lazy_import('sklearn.ensemble')
+xgb = lazy_import('xgboost')
+
+# Upper bound on rows x trees node indices held in memory per traversal chunk
+MAX_CHUNK_CELLS = 1 << 21
+
+# Largest batch scored with the compiled forest; past this the native C/C++
+# predict loops beat per-level NumPy gathers (see the benchmark)
+COMPILED_MAX_ROWS = 16
+
+
+class CompiledForest:
+    """Additive tree ensemble: ``base + sum(leaf value of each tree)``"""
+
+    def __init__(self, trees, base):
+        """Build from ``(feature, threshold, left, right, value, strict)`` node arrays per tree.
+
+        ``left`` / ``right`` are tree-local child indices with -1 at leaves, and
+        ``strict`` marks trees whose splits send ``x < threshold`` left.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for feature, threshold, left, right, value, strict in trees:
+            n_nodes = len(feature)
+            local = np.arange(n_nodes)
+            leaf = left < 0
+            threshold32 = _round_down_float32(threshold, strict)
+            threshold32[leaf] = np.inf
+            features.append(np.where(leaf, 0, feature).astype(np.int32))
+            thresholds.append(threshold32)
+            lefts.append((np.where(leaf, local, left) + offset).astype(np.int32))
+            rights.append((np.where(leaf, local, right) + offset).astype(np.int32))
+            values.append(np.where(leaf, value, 0.0))
+            roots.append(offset)
+            depth = max(depth, _tree_depth(left, right))
+            offset += n_nodes
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        # Children interleaved as [left, right] per node, so one gather at
+        # 2 * node + went_right picks the next node
+        self.children = np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).ravel()
+        self.value = np.concatenate(values)
+        self.is_leaf = self.children[0::2] == np.arange(len(self.feature))
+        self.roots = np.array(roots, dtype=np.int32)
+        self.base = float(base)
+        self.depth = depth
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children, self.value, self.roots))
+
+    def predict(self, X):
+        """Predictions for a 2D feature matrix (any array-like)"""
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        if X.ndim == 1:
+            X = X[None, :]
+        chunk = max(1, MAX_CHUNK_CELLS // self.n_trees)
+        if len(X) <= chunk:
+            return self._predict_chunk(X)
+        return np.concatenate([self._predict_chunk(X[i:i + chunk]) for i in range(0, len(X), chunk)])
+
+    def _predict_chunk(self, X):
+        # Offsets of each row in the flattened matrix, so feature reads are one flat gather
+        flat = X.ravel()
+        row_offsets = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.depth):
+            went_right = flat[row_offsets + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + went_right]
+            if self.is_leaf[node].all():
+                break
+        return self.base + self.value[node].sum(axis=1)
+
+
+def _round_down_float32(threshold, strict):
+    """Largest float32 t with ``x <= t`` equivalent to the original split on float32 ``x``"""
+    threshold = np.asarray(threshold, dtype=np.float64)
+    rounded = threshold.astype(np.float32)
+    # Round down when float32 rounding went up, and step below strict thresholds
+    # (x < t is x <= the float32 just under t)
+    step_down = (rounded.astype(np.float64) >= threshold) if strict else (rounded.astype(np.float64) > threshold)
+    return np.where(step_down, np.nextafter(rounded, np.float32(-np.inf)), rounded).astype(np.float32)
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=np.int32)
+    # Children always come after their parent in both sklearn and XGBoost node order
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def _sklearn_tree(estimator, scale):
+    tree = estimator.tree_
+    return (tree.feature, tree.threshold, tree.children_left, tree.children_right,
+            tree.value[:, 0, 0] * scale, False)
+
+
+def compile_model(model):
+    """Compile a fitted tree ensemble, or return None for unsupported models"""
+    if isinstance(model, ensemble.RandomForestRegressor):
+        scale = 1.0 / len(model.estimators_)
+        return CompiledForest([_sklearn_tree(tree, scale) for tree in model.estimators_], 0.0)
+
+    if isinstance(model, ensemble.GradientBoostingRegressor):
+        base = model.init_.constant_[0, 0] if model.init_ != 'zero' else 0.0
+        trees = [_sklearn_tree(stage[0], model.learning_rate) for stage in model.estimators_]
+        return CompiledForest(trees, base)
+
+    if isinstance(model, xgb.XGBRegressor):
+        learner = json.loads(model.get_booster().save_raw('json'))['learner']
+        if learner['objective']['name'] != 'reg:squarederror':
+            return None
+        base = float(learner['learner_model_param']['base_score'].strip('[]'))
+        trees = []
+        for tree in learner['gradient_booster']['model']['trees']:
+            left = np.array(tree['left_children'])
+            # Leaf values are stored in split_conditions
+            conditions = np.array(tree['split_conditions'], dtype=np.float64)
+            trees.append((np.array(tree['split_indices']), conditions, left,
+                          np.array(tree['right_children']), conditions, True))
+        return CompiledForest(trees, base)
+
+    return None
+
+
+def compile_models(trained_models):
+    """Compiled forests for every supported model in ``trained_models``"""
+    compiled = {}
+    for name, model in trained_models.items():
+        forest = compile_model(model)
+        if forest is not None:
+            compiled[name] = forest
+    return compiled
+
+
+def scoring_model(bundle, model_name, n_rows=1):
+    """Model to predict ``n_rows`` rows with: the compiled forest for small batches, else the native model"""
+    compiled = bundle.get('compiled_models', {}).get(model_name)
+    if compiled is not None and n_rows <= COMPILED_MAX_ROWS:
+        return compiled
+    return bundle['trained_models'][model_name]
+
+
+def _best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compiled and native tree ensemble latency")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 100, 100000])
+    parser.add_argument('--data', default='salaries.csv')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # Imported here so the engine itself only depends on the model libraries
+    from prediction_server import load_bundle
+
+    bundle = load_bundle(args.data, args.model_dir)
+    X_test = np.asarray(bundle['X_test'], dtype=np.float64)
+    rng = np.random.default_rng(0)
+    compiled = bundle.get('compiled_models') or compile_models(bundle['trained_models'])
+
+    print(f"{'model':<20}{'rows':>9}{'native ms':>12}{'compiled ms':>13}{'speedup':>9}{'max abs diff':>14}")
+    for name, forest in compiled.items():
+        native = bundle['trained_models'][name]
+        for n_rows in args.rows:
+            X = X_test[rng.integers(0, len(X_test), n_rows)]
+            native_time = _best_of(lambda: native.predict(X), args.repeat)
+            compiled_time = _best_of(lambda: forest.predict(X), args.repeat)
+            diff = np.abs(native.predict(X) - forest.predict(X)).max()
+            print(f"{name:<20}{n_rows:>9}{native_time * 1000:>12.3f}{compiled_time * 1000:>13.3f}"
+                  f"{native_time / compiled_time:>8.1f}x{diff:>14.4f}")
+
+
+if __name__ == '__main__':
+    main()